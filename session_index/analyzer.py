@@ -13,54 +13,131 @@ Usage:
     python3 -m session_index.analyzer synthesize "query" [--limit 10]
 """
 
+import atexit
 import json
+import math
+import mmap
 import os
 import re
 import sys
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Iterator, Optional
 
 try:
     from . import config
+    from .indexer import SessionIndexer, decode_jsonl_line
 except ImportError:
     import config
+    from indexer import SessionIndexer, decode_jsonl_line
+
+# Optional linear-time regex engine for user-supplied query patterns
+try:
+    import re2 as _re2
+except ImportError:
+    _re2 = None
+
+
+def _open_readonly(db_path: Path) -> sqlite3.Connection:
+    """Open sessions.db read-only, tuned for scans.
+
+    Memory-mapped pages, a 64MB page cache, and in-memory temp B-trees for
+    the GROUP BY/ORDER BY sorts. Read-only mode never takes a write lock,
+    so the indexer can keep writing while we read.
+    """
+    uri = Path(db_path).expanduser().resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only=1")
+    conn.execute("PRAGMA mmap_size=1073741824")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+_READONLY_CONNS: dict[str, sqlite3.Connection] = {}
+
+
+def _get_conn(db_path: Path) -> sqlite3.Connection:
+    """Shared read-only connection per database, opened on first use.
+
+    Repeated calls in one process (e.g. `search --context` asking for the
+    context of every hit) skip the open + schema load. Closed at exit.
+    """
+    key = str(Path(db_path).expanduser().resolve())
+    conn = _READONLY_CONNS.get(key)
+    if conn is None:
+        conn = _open_readonly(db_path)
+        _READONLY_CONNS[key] = conn
+    return conn
+
+
+@atexit.register
+def _close_conns():
+    for conn in _READONLY_CONNS.values():
+        conn.close()
+    _READONLY_CONNS.clear()
+
 
 # ---------------------------------------------------------------------------
 # A. Context retrieval — JSONL parsing
 # ---------------------------------------------------------------------------
 
+_READ_CHUNK = 1 << 20
+_NO_MESSAGE: dict = {}  # shared default for entries without a message — never mutated
+
+
+def _read_jsonl(f) -> Iterator:
+    """Yield decoded entries from a binary JSONL file, skipping malformed lines.
+
+    Reads 1MB chunks and splits them on newlines, so lines skip the
+    text-layer decode (orjson takes bytes directly).
+    """
+    parts = []  # pieces of a line that spans chunks
+    while chunk := f.read(_READ_CHUNK):
+        nl = chunk.find(b"\n")
+        if nl == -1:
+            parts.append(chunk)
+            continue
+        parts.append(chunk[:nl])
+        lines = chunk[nl + 1:].split(b"\n")
+        lines[0:0] = [b"".join(parts)]
+        parts = [lines.pop()]
+        for line in lines:
+            if line.strip():
+                entry = decode_jsonl_line(line)
+                if entry is not None:
+                    yield entry
+    line = b"".join(parts)
+    if line.strip():
+        entry = decode_jsonl_line(line)
+        if entry is not None:
+            yield entry
+
+
+# One-line renderers for tool_use blocks, keyed by tool name
+_TOOL_FORMATTERS = {
+    "Read": lambda inp: f"[Read: {inp.get('file_path', '?')}]",
+    "Edit": lambda inp: f"[Edit: {inp.get('file_path', '?')} ({(inp.get('old_string') or '')[:40]}...)]",
+    "Write": lambda inp: f"[Write: {inp.get('file_path', '?')}]",
+    "Bash": lambda inp: f"[Bash: {(inp.get('command') or '')[:60]}]",
+    "Task": lambda inp: f'[Task: "{inp.get("description", "")}" → {inp.get("subagent_type", "")}]',
+    "Grep": lambda inp: f"[Grep: {inp.get('pattern', '?')}]",
+    "Glob": lambda inp: f"[Glob: {inp.get('pattern', '?')}]",
+    "WebFetch": lambda inp: f"[WebFetch: {inp.get('url', '?')[:60]}]",
+    "WebSearch": lambda inp: f"[WebSearch: {inp.get('query', '?')}]",
+}
+
+
 def _summarize_tool_call(item: dict) -> str:
     """Collapse a tool_use block into a one-liner."""
     name = item.get("name", "unknown")
-    inp = item.get("input", {})
-
-    if name == "Read":
-        return f"[Read: {inp.get('file_path', '?')}]"
-    elif name == "Edit":
-        fp = inp.get("file_path", "?")
-        old = (inp.get("old_string") or "")[:40]
-        return f"[Edit: {fp} ({old}...)]"
-    elif name == "Write":
-        return f"[Write: {inp.get('file_path', '?')}]"
-    elif name == "Bash":
-        cmd = (inp.get("command") or "")[:60]
-        return f"[Bash: {cmd}]"
-    elif name == "Task":
-        desc = inp.get("description", "")
-        atype = inp.get("subagent_type", "")
-        return f'[Task: "{desc}" → {atype}]'
-    elif name == "Grep":
-        return f"[Grep: {inp.get('pattern', '?')}]"
-    elif name == "Glob":
-        return f"[Glob: {inp.get('pattern', '?')}]"
-    elif name == "WebFetch":
-        return f"[WebFetch: {inp.get('url', '?')[:60]}]"
-    elif name == "WebSearch":
-        return f"[WebSearch: {inp.get('query', '?')}]"
-    else:
+    fmt = _TOOL_FORMATTERS.get(name)
+    if fmt is None:
         return f"[{name}]"
+    return fmt(item.get("input", {}))
 
 
 def _extract_assistant_text(content) -> str:
@@ -97,161 +174,314 @@ def _extract_user_text(content) -> str:
     return str(content)
 
 
-def extract_exchanges(session_path: str | Path, query: str = None,
+_REGEX_META = re.compile(r"[.^$*+?{}\[\]\\|()]")
+# A quantified group that itself contains a quantifier — (a+)+, (\w*\s?)*.
+# These backtrack exponentially in `re`, so such queries are matched literally.
+_NESTED_QUANTIFIER = re.compile(r"\((?:[^()\\]|\\.)*[+*}](?:[^()\\]|\\.)*\)[+*{]")
+_GATE_WORD = re.compile(r"[A-Za-z0-9_-]+\Z")
+# Words the extractor can emit without them being in the file
+_GENERATED_TEXT = "unknown None"
+
+
+def _compile_user_regex(query: str):
+    """Compile a user query as a case-insensitive regex, or None.
+
+    Uses re2 when installed — linear-time matching, so no pattern can stall
+    a scan. Otherwise stdlib `re`, refusing nested quantifiers (the
+    catastrophic-backtracking shape). None means "match it literally".
+    """
+    if _re2 is not None:
+        try:
+            return _re2.compile("(?i)" + query)
+        except Exception:
+            pass  # syntax re2 doesn't support (backreferences, lookaround)
+    if _NESTED_QUANTIFIER.search(query):
+        return None
+    try:
+        return re.compile(query, re.IGNORECASE)
+    except re.error:
+        return None
+
+
+class _QueryMatcher:
+    """Precompiled query for matching exchanges, reusable across sessions.
+
+    Match tiers, best first: 0 = regex, 1 = substring, 2 = any query word.
+    Queries without regex metacharacters skip the user-regex tier — for
+    them the case-insensitive substring test is the regex tier. All query
+    words are folded into one alternation, so the word tier is a single
+    scan per text instead of one `in` test per word.
+    """
+
+    __slots__ = ("pattern", "phrase", "words", "gate")
+
+    def __init__(self, query: str):
+        self.pattern = _compile_user_regex(query) if _REGEX_META.search(query) else None
+        self.phrase = re.compile(re.escape(query), re.IGNORECASE)
+        words = [w for w in query.split() if len(w) > 2]
+        self.words = (
+            re.compile("|".join(re.escape(w) for w in words), re.IGNORECASE)
+            if words else None
+        )
+
+        # Byte-level prefilter over the raw JSONL. Any match at any tier
+        # contains at least one query word, and plain ASCII words appear
+        # verbatim in the JSON encoding — so a file without any of them
+        # cannot match. Not usable for real regexes, or for words that
+        # could come from text the extractor makes up (tool-call fallbacks).
+        self.gate = None
+        if (self.pattern is None and words
+                and all(_GATE_WORD.match(w) for w in words)
+                and not self.words.search(_GENERATED_TEXT)):
+            self.gate = re.compile(
+                b"|".join(re.escape(w.encode()) for w in words), re.IGNORECASE
+            )
+
+    def could_match(self, f) -> bool:
+        """Cheap raw-bytes check on an open binary file.
+
+        False means the file has no matching exchange.
+        """
+        if self.gate is None:
+            return True
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return self.gate.search(mm) is not None
+
+    def tier(self, user_text: str, assistant_text: str, floor: int = 2) -> Optional[int]:
+        """Return the best tier this exchange matches, or None.
+
+        Tiers worse than `floor` are not checked (a better tier already has hits).
+        """
+        if self.pattern is not None:
+            if self.pattern.search(user_text) or self.pattern.search(assistant_text):
+                return 0
+            if floor == 0:
+                return None
+
+        if self.phrase.search(user_text) or self.phrase.search(assistant_text):
+            return 1 if self.pattern is not None else 0
+
+        if floor < 2 or self.words is None:
+            return None
+        if self.words.search(user_text) or self.words.search(assistant_text):
+            return 2
+        return None
+
+
+def extract_exchanges(session_path: str | Path, query: "str | _QueryMatcher" = None,
                       limit: int = 10, max_chars: int = 1000) -> list[dict]:
     """Extract user+assistant exchange pairs from JSONL.
 
     If query provided, only return exchanges where user message matches.
+    Accepts a prebuilt _QueryMatcher so callers scanning many sessions
+    compile the query once.
     Returns list of {user: str, assistant: str, timestamp: str} dicts.
-    """
-    path = Path(session_path)
-    if not path.exists():
-        return []
 
-    # First pass: collect ordered entries
-    entries = []
+    Streams the file one exchange at a time and stops reading as soon as
+    `limit` exchanges are collected at the best match tier.
+    """
+    # One open() per session: a missing file is just an empty result
     try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-
-                etype = entry.get("type")
-                if etype not in ("user", "assistant"):
-                    continue
-
-                msg = entry.get("message", {})
-                content = msg.get("content", "")
-                ts = entry.get("timestamp", "")
-
-                if etype == "user":
-                    text = _extract_user_text(content)
-                else:
-                    text = _extract_assistant_text(content)
-
-                entries.append({
-                    "type": etype,
-                    "text": text,
-                    "timestamp": ts,
-                })
-    except Exception as e:
-        print(f"Error reading {path}: {e}", file=sys.stderr)
+        f = open(session_path, "rb")
+    except OSError:
         return []
+    with f:
+        return _extract_from_file(f, session_path, query, limit, max_chars)
 
-    # Pair consecutive user → assistant messages
-    exchanges = []
-    i = 0
-    while i < len(entries):
-        if entries[i]["type"] == "user":
-            user_text = entries[i]["text"]
-            user_ts = entries[i]["timestamp"]
-            assistant_text = ""
-
-            # Collect all assistant messages until next user message
-            j = i + 1
-            assistant_parts = []
-            while j < len(entries) and entries[j]["type"] == "assistant":
-                assistant_parts.append(entries[j]["text"])
-                j += 1
-            assistant_text = "\n".join(assistant_parts)
-
-            exchanges.append({
-                "user": user_text,
-                "assistant": assistant_text,
-                "timestamp": user_ts,
-            })
-            i = j
-        else:
-            i += 1
 
-    # Filter by query if provided
+def _extract_from_file(f, session_path, query, limit: int, max_chars: int) -> list[dict]:
+    """Body of extract_exchanges, reading from an already-open binary file."""
+    matcher = None
     if query:
-        # Try regex first, then substring, then individual words
-        matched = None
+        matcher = query if isinstance(query, _QueryMatcher) else _QueryMatcher(query)
         try:
-            pattern = re.compile(query, re.IGNORECASE)
-            matched = [
-                ex for ex in exchanges
-                if pattern.search(ex["user"]) or pattern.search(ex["assistant"])
-            ]
-        except re.error:
+            if not matcher.could_match(f):
+                return []
+        except (OSError, ValueError):
             pass
 
-        if not matched:
-            q = query.lower()
-            matched = [
-                ex for ex in exchanges
-                if q in ex["user"].lower() or q in ex["assistant"].lower()
-            ]
+    # One bucket per match tier; a lower tier only counts if every
+    # higher tier matched nothing.
+    tiers = ([], [], [])
+    exchanges = tiers[0] if matcher else []
+
+    def _emit(user_text: str, assistant_parts: list, user_ts: str) -> bool:
+        """Route a completed exchange to its tier. Returns True when done."""
+        assistant_text = "\n".join(assistant_parts)
+
+        if matcher:
+            floor = 0 if tiers[0] else (1 if tiers[1] else 2)
+            tier = matcher.tier(user_text, assistant_text, floor)
+            if tier is None:
+                return False
+            bucket = tiers[tier]
+        else:
+            bucket = exchanges
+        if len(bucket) >= limit:
+            return bucket is exchanges
+
+        if len(user_text) > max_chars:
+            user_text = user_text[:max_chars] + "..."
+        if len(assistant_text) > max_chars:
+            assistant_text = assistant_text[:max_chars] + "..."
+        bucket.append({
+            "user": user_text,
+            "assistant": assistant_text,
+            "timestamp": user_ts,
+        })
+        return bucket is exchanges and len(exchanges) >= limit
+
+    # Pair each user message with the assistant messages that follow it.
+    # This loop runs once per JSONL line, so module-level helpers are bound
+    # to locals and the shared empty dict avoids a fresh {} per miss.
+    user_text_of = _extract_user_text
+    assistant_text_of = _extract_assistant_text
+    no_message = _NO_MESSAGE
+    pending_user_text = None
+    pending_user_ts = ""
+    pending_assistant_parts = []
+    try:
+        for entry in _read_jsonl(f):
+            etype = entry.get("type")
+            if etype == "user":
+                if pending_user_text is not None and _emit(
+                    pending_user_text, pending_assistant_parts, pending_user_ts
+                ):
+                    pending_user_text = None
+                    break
+                msg = entry.get("message", no_message)
+                pending_user_text = user_text_of(msg.get("content", ""))
+                pending_user_ts = entry.get("timestamp", "")
+                pending_assistant_parts = []
+            elif etype == "assistant" and pending_user_text is not None:
+                msg = entry.get("message", no_message)
+                pending_assistant_parts.append(assistant_text_of(msg.get("content", "")))
+    except Exception as e:
+        print(f"Error reading {session_path}: {e}", file=sys.stderr)
+        return []
 
-        # If exact match fails, try matching ANY word from the query
-        if not matched:
-            words = [w.lower() for w in query.split() if len(w) > 2]
-            if words:
-                matched = [
-                    ex for ex in exchanges
-                    if any(w in ex["user"].lower() or w in ex["assistant"].lower()
-                           for w in words)
-                ]
+    if pending_user_text is not None:
+        _emit(pending_user_text, pending_assistant_parts, pending_user_ts)
 
-        exchanges = matched or []
+    if matcher:
+        return tiers[0] or tiers[1] or tiers[2]
+    return exchanges
 
-    # Truncate long messages
-    for ex in exchanges:
-        if len(ex["user"]) > max_chars:
-            ex["user"] = ex["user"][:max_chars] + "..."
-        if len(ex["assistant"]) > max_chars:
-            ex["assistant"] = ex["assistant"][:max_chars] + "..."
 
-    return exchanges[:limit]
+_CONTEXT_COLUMNS = (
+    "session_id, file_path, title_display, project_name, client, "
+    "start_time, exchange_count, duration_minutes"
+)
 
 
 def get_context(session_id: str, query: str = None, limit: int = 10,
-                db_path: Path = None) -> dict:
+                db_path: Path = None, conn: sqlite3.Connection = None) -> dict:
     """Get conversation context for a session.
 
     Returns dict with session info + matching exchanges.
     """
-    if db_path is None:
-        db_path = config.get_db_path()
+    return get_contexts([session_id], query=query, limit=limit,
+                        db_path=db_path, conn=conn)[0]
 
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
 
-    # Resolve partial session ID
-    if len(session_id) < 36:
-        row = conn.execute(
-            "SELECT session_id, file_path, title_display, project_name, client, "
-            "start_time, exchange_count, duration_minutes "
-            "FROM sessions WHERE session_id LIKE ?",
-            (f"{session_id}%",)
-        ).fetchone()
-    else:
-        row = conn.execute(
-            "SELECT session_id, file_path, title_display, project_name, client, "
-            "start_time, exchange_count, duration_minutes "
-            "FROM sessions WHERE session_id = ?",
-            (session_id,)
-        ).fetchone()
+def get_contexts(session_ids: list[str], query: str = None, limit: int = 10,
+                 db_path: Path = None, conn: sqlite3.Connection = None) -> list[dict]:
+    """Get conversation context for several sessions at once.
 
-    conn.close()
+    Resolves every (full or prefix) ID in one query and reads the JSONL
+    files in parallel. Returns one get_context()-style dict per ID, in order.
+    Pass `conn` to reuse a caller's open connection (Row factory required).
+    """
+    if conn is None:
+        if db_path is None:
+            db_path = config.get_db_path()
+        conn = _get_conn(db_path)
+
+    full = [sid for sid in session_ids if len(sid) >= 36]
+    partial = [sid for sid in session_ids if len(sid) < 36]
+    clauses = []
+    params = list(full)
+    if full:
+        clauses.append(f"session_id IN ({','.join('?' * len(full))})")
+    # Prefixes as primary-key range scans (LIKE only uses the index under
+    # case_sensitive_like); IDs are lowercase hex
+    for sid in partial:
+        clauses.append("(session_id >= ? AND session_id < ?)")
+        params += [sid.lower(), sid.lower() + "\uffff"]
+
+    rows = []
+    if clauses:
+        rows = conn.execute(
+            f"SELECT {_CONTEXT_COLUMNS} FROM sessions WHERE {' OR '.join(clauses)}",
+            params,
+        ).fetchall()
+
+    # Map each requested ID back to its session row
+    by_id = {row["session_id"]: row for row in rows}
+    resolved = []
+    for sid in session_ids:
+        row = by_id.get(sid)
+        if row is None and len(sid) < 36:
+            prefix = sid.lower()
+            row = min((r for r in rows if r["session_id"].startswith(prefix)),
+                      key=lambda r: r["session_id"], default=None)
+        resolved.append(row)
+
+    found = [row for row in resolved if row is not None]
+    matcher = _QueryMatcher(query) if query else None
+    exchange_lists = {}
+    if found:
+        with ThreadPoolExecutor(max_workers=min(8, len(found))) as pool:
+            for row, exchanges in zip(found, pool.map(
+                lambda r: extract_exchanges(r["file_path"], query=matcher, limit=limit),
+                found,
+            )):
+                exchange_lists[row["session_id"]] = exchanges
+
+    results = []
+    for sid, row in zip(session_ids, resolved):
+        if row is None:
+            results.append({"error": f"Session not found: {sid}"})
+            continue
+        exchanges = exchange_lists[row["session_id"]]
+        results.append({
+            "session": dict(row),
+            "query": query,
+            "exchanges": exchanges,
+            "total_matches": len(exchanges),
+        })
+    return results
 
-    if not row:
-        return {"error": f"Session not found: {session_id}"}
 
-    session_info = dict(row)
-    exchanges = extract_exchanges(
-        session_info["file_path"], query=query, limit=limit
-    )
+_MONTH_ABBR = {
+    "01": "Jan", "02": "Feb", "03": "Mar", "04": "Apr", "05": "May", "06": "Jun",
+    "07": "Jul", "08": "Aug", "09": "Sep", "10": "Oct", "11": "Nov", "12": "Dec",
+}
 
-    return {
-        "session": session_info,
-        "query": query,
-        "exchanges": exchanges,
-        "total_matches": len(exchanges),
-    }
+
+def format_timestamp(ts: str) -> str:
+    """'2026-01-20T19:14:05Z' → 'Jan 20, 19:14'.
+
+    ISO timestamps are reformatted by slicing; anything else goes through
+    datetime, and is shown as-is (to the minute) if that fails too.
+    """
+    ts = ts[:16] if ts else ""
+    month = _MONTH_ABBR.get(ts[5:7])
+    if (month and len(ts) == 16 and ts[4] == "-" and ts[7] == "-"
+            and ts[10] in "T " and ts[13] == ":"):
+        return f"{month} {ts[8:10]}, {ts[11:16]}"
+    try:
+        return datetime.fromisoformat(ts).strftime("%b %d, %H:%M")
+    except (ValueError, TypeError):
+        return ts
+
+
+# Indent for the continuation lines of a multi-line message
+_CONTINUATION = "\n  │     "
+_CARD_FOOTER = f"╰{'─' * 48}"
+_EXCHANGE_FOOTER = f"  └{'─' * 44}"
 
 
 def format_context(result: dict) -> str:
@@ -264,7 +494,7 @@ def format_context(result: dict) -> str:
     title = s.get("title_display") or "(unnamed)"
 
     # Session header card
-    lines.append(f"\n╭─── {title} {'─' * max(1, 44 - len(title))}")
+    lines.append(f"\n╭─── {title + ' ─':─<45}")
     meta = []
     if s.get('start_time'):
         meta.append(s['start_time'][:10])
@@ -276,7 +506,7 @@ def format_context(result: dict) -> str:
         meta.append(f"{s['duration_minutes']}min")
     lines.append(f"│ {' · '.join(meta)}")
     lines.append(f"│ → claude --resume {s['session_id']}")
-    lines.append(f"╰{'─' * 48}")
+    lines.append(_CARD_FOOTER)
 
     if result["query"]:
         lines.append(f"\nMatching exchanges for \"{result['query']}\":\n")
@@ -284,35 +514,20 @@ def format_context(result: dict) -> str:
         lines.append(f"\nAll exchanges ({result['total_matches']} shown):\n")
 
     for i, ex in enumerate(result["exchanges"], 1):
-        ts = ex["timestamp"][:16] if ex["timestamp"] else ""
-        try:
-            dt = datetime.fromisoformat(ts)
-            ts_display = dt.strftime("%b %d, %H:%M")
-        except (ValueError, TypeError):
-            ts_display = ts
-        lines.append(f"  ┌─ {ts_display} {'─' * max(1, 40 - len(ts_display))}")
+        ts_display = format_timestamp(ex["timestamp"])
+        lines.append(f"  ┌─ {ts_display + ' ─':─<41}")
         lines.append(f"  │")
 
         # User message — first line gets emoji, rest indented
-        user_lines = ex['user'].split('\n')
-        for j, ul in enumerate(user_lines):
-            if j == 0:
-                lines.append(f"  │  🧑 {ul}")
-            else:
-                lines.append(f"  │     {ul}")
+        lines.append("  │  🧑 " + ex['user'].replace('\n', _CONTINUATION))
 
         lines.append(f"  │")
 
         # Assistant message
-        asst_lines = ex['assistant'].split('\n')
-        for j, al in enumerate(asst_lines):
-            if j == 0:
-                lines.append(f"  │  🤖 {al}")
-            else:
-                lines.append(f"  │     {al}")
+        lines.append("  │  🤖 " + ex['assistant'].replace('\n', _CONTINUATION))
 
         lines.append(f"  │")
-        lines.append(f"  └{'─' * 44}")
+        lines.append(_EXCHANGE_FOOTER)
         lines.append("")
 
     return "\n".join(lines)
@@ -322,136 +537,246 @@ def format_context(result: dict) -> str:
 # B. Analytics — pure SQL
 # ---------------------------------------------------------------------------
 
+def _ensure_rollups(conn: sqlite3.Connection, db_path: Path):
+    """Create + populate the rollup tables on databases indexed before they existed."""
+    has_rollups = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='rollup_daily'"
+    ).fetchone()
+    if has_rollups:
+        return
+    indexer = SessionIndexer(db_path=db_path)
+    indexer.connect()
+    indexer.close()
+
+
+ANALYTICS_CACHE_ENTRIES = 32
+
+
+def _db_stamp(db_path: Path) -> list:
+    """(mtime_ns, size) of the DB and its WAL — changes whenever data does."""
+    stamp = []
+    for p in (Path(db_path), Path(f"{db_path}-wal")):
+        try:
+            st = p.stat()
+            stamp.append([st.st_mtime_ns, st.st_size])
+        except OSError:
+            stamp.append(None)
+    return stamp
+
+
+def _analytics_cache_file(db_path: Path) -> Path:
+    db_path = Path(db_path)
+    return db_path.with_name(db_path.name + ".analytics-cache.json")
+
+
+def _load_analytics_cache(cache_file: Path) -> dict:
+    try:
+        return json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_analytics_cache(cache_file: Path, cache: dict):
+    while len(cache) > ANALYTICS_CACHE_ENTRIES:
+        cache.pop(next(iter(cache)))
+    tmp = cache_file.with_name(cache_file.name + ".tmp")
+    try:
+        tmp.write_text(json.dumps(cache))
+        tmp.replace(cache_file)
+    except OSError:
+        pass
+
+
 def analytics(client: str = None, project: str = None,
               week: bool = False, month: bool = False,
               db_path: Path = None) -> dict:
-    """Run analytics queries against sessions.db. Returns structured dict."""
+    """Run analytics queries against sessions.db. Returns structured dict.
+
+    Session and tool aggregates read the per-day rollup tables maintained
+    by the indexer, so periods are whole days.
+
+    Results are cached next to the DB, keyed on the DB/WAL stamp, today's
+    date and the arguments — repeat runs skip SQLite until something is
+    indexed (or the day rolls over).
+    """
     if db_path is None:
         db_path = config.get_db_path()
 
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
+    cache_file = _analytics_cache_file(db_path)
+    cache_key = json.dumps([
+        _db_stamp(db_path), datetime.now().date().isoformat(),
+        client, project, week, month,
+    ])
+    cache = _load_analytics_cache(cache_file)
+    if cache_key in cache:
+        return cache[cache_key]
+
+    conn = _get_conn(db_path)
+    _ensure_rollups(conn, db_path)
     results = {}
 
+    # Filters apply to both rollup rows (r) and sessions (s) — same column names
+    clauses = []
+    params = {}
+
     # Period filter
-    period_clause = ""
-    period_params = []
     period_label = "all time"
     if week:
-        period_clause = "AND s.start_time >= ?"
-        period_params = [(datetime.now() - timedelta(days=7)).isoformat()]
+        clauses.append("{t}.{day} >= :since")
+        params["since"] = (datetime.now() - timedelta(days=7)).date().isoformat()
         period_label = "this week"
     elif month:
-        period_clause = "AND s.start_time >= ?"
-        period_params = [(datetime.now() - timedelta(days=30)).isoformat()]
+        clauses.append("{t}.{day} >= :since")
+        params["since"] = (datetime.now() - timedelta(days=30)).date().isoformat()
         period_label = "this month"
 
     results["period"] = period_label
 
     # Client filter
-    client_clause = ""
-    client_params = []
     if client:
-        client_clause = "AND s.client LIKE ?"
-        client_params = [f"%{client}%"]
+        clauses.append("{t}.client LIKE :client")
+        params["client"] = f"%{client}%"
 
     # Project filter
-    project_clause = ""
-    project_params = []
     if project:
-        project_clause = "AND (s.project_name LIKE ? OR s.project LIKE ?)"
-        project_params = [f"%{project}%", f"%{project}%"]
+        clauses.append("({t}.project_name LIKE :project OR {t}.project LIKE :project)")
+        params["project"] = f"%{project}%"
 
-    base_where = f"WHERE 1=1 {period_clause} {client_clause} {project_clause}"
-    base_params = period_params + client_params + project_params
+    where = " ".join(f"AND {c}" for c in clauses)
+    rollup_where = "WHERE 1=1 " + where.format(t="r", day="day")
+    session_where = "WHERE 1=1 " + where.format(t="s", day="start_time")
 
-    # 1. Time per client
-    rows = conn.execute(f"""
-        SELECT s.client, COUNT(*) as sessions,
-               SUM(s.duration_minutes) as total_minutes,
-               ROUND(AVG(s.exchange_count), 1) as avg_exchanges
-        FROM sessions s
-        {base_where} AND s.client IS NOT NULL
-        GROUP BY s.client ORDER BY total_minutes DESC
-    """, base_params).fetchall()
-    results["time_per_client"] = [dict(r) for r in rows]
-
-    # 2. Session frequency (last 14 days, ignoring period filter)
-    rows = conn.execute("""
-        SELECT date(start_time) as day, COUNT(*) as sessions,
-               SUM(duration_minutes) as minutes
-        FROM sessions
-        WHERE start_time >= date('now', '-14 days')
-        GROUP BY day ORDER BY day
-    """).fetchall()
-    results["daily_trend"] = [dict(r) for r in rows]
-
-    # 3. Overall stats for period
-    row = conn.execute(f"""
-        SELECT COUNT(*) as total_sessions,
-               SUM(duration_minutes) as total_minutes,
-               ROUND(AVG(duration_minutes), 1) as avg_duration,
-               ROUND(AVG(exchange_count), 1) as avg_exchanges,
-               SUM(CASE WHEN has_compaction = 1 THEN 1 ELSE 0 END) as compacted_sessions
-        FROM sessions s
-        {base_where}
-    """, base_params).fetchone()
-    results["overview"] = dict(row)
-
-    # 4. Top tools (period-aware)
-    rows = conn.execute(f"""
-        SELECT st.tool_name, SUM(st.use_count) as total,
-               COUNT(DISTINCT st.session_id) as session_count
-        FROM session_tools st
-        JOIN sessions s ON s.session_id = st.session_id
-        {base_where}
-        GROUP BY st.tool_name ORDER BY total DESC LIMIT 15
-    """, base_params).fetchall()
-    results["top_tools"] = [dict(r) for r in rows]
-
-    # 5. Tool trends: this week vs last week
-    this_week_start = (datetime.now() - timedelta(days=7)).isoformat()
-    last_week_start = (datetime.now() - timedelta(days=14)).isoformat()
-    rows = conn.execute("""
-        SELECT tool_name,
-               SUM(CASE WHEN s.start_time >= ? THEN use_count ELSE 0 END) as this_week,
-               SUM(CASE WHEN s.start_time >= ? AND s.start_time < ? THEN use_count ELSE 0 END) as last_week
-        FROM session_tools st
-        JOIN sessions s ON s.session_id = st.session_id
-        WHERE s.start_time >= ?
-        GROUP BY tool_name
-        HAVING this_week > 0 OR last_week > 0
-        ORDER BY this_week DESC
-        LIMIT 15
-    """, (this_week_start, last_week_start, this_week_start, last_week_start)).fetchall()
-    results["tool_trends"] = [dict(r) for r in rows]
-
-    # 6. Most-discussed topics
+    params["this_week"] = (datetime.now() - timedelta(days=7)).date().isoformat()
+    params["last_week"] = (datetime.now() - timedelta(days=14)).date().isoformat()
+
+    # Round trip 1 — session aggregates, one tagged row set:
+    #   overview, time per client, per project, daily trend (last 14 days,
+    #   ignoring filters)
     rows = conn.execute(f"""
-        SELECT st.topic, COUNT(*) as mentions, st.source
-        FROM session_topics st
-        JOIN sessions s ON s.session_id = st.session_id
-        {base_where}
-        GROUP BY st.topic
-        ORDER BY mentions DESC
-        LIMIT 20
-    """, base_params).fetchall()
-    results["top_topics"] = [dict(r) for r in rows]
-
-    # 7. Sessions per project
+        WITH filtered AS (SELECT * FROM rollup_daily r {rollup_where})
+        SELECT 'overview' as tag, NULL as key,
+               COALESCE(SUM(sessions), 0) as sessions,
+               SUM(total_minutes) as total_minutes,
+               ROUND(SUM(exchange_sum) * 1.0 / SUM(exchange_sessions), 1) as avg_exchanges,
+               ROUND(SUM(total_minutes) * 1.0 / SUM(timed_sessions), 1) as avg_duration,
+               SUM(compacted_sessions) as compacted_sessions,
+               NULL as sort_desc, NULL as sort_asc
+        FROM filtered
+        UNION ALL
+        SELECT 'client', client, SUM(sessions), SUM(total_minutes),
+               ROUND(SUM(exchange_sum) * 1.0 / SUM(exchange_sessions), 1),
+               NULL, NULL, SUM(total_minutes), NULL
+        FROM filtered WHERE client IS NOT NULL
+        GROUP BY client
+        UNION ALL
+        SELECT 'project', project_name, SUM(sessions), SUM(total_minutes),
+               NULL, NULL, NULL, SUM(sessions), NULL
+        FROM filtered
+        GROUP BY project_name
+        UNION ALL
+        SELECT 'daily', day, SUM(sessions), SUM(total_minutes),
+               NULL, NULL, NULL, NULL, day
+        FROM rollup_daily
+        WHERE day >= date('now', '-14 days')
+        GROUP BY day
+        ORDER BY tag, sort_desc DESC, sort_asc
+    """, params).fetchall()
+
+    results["time_per_client"] = []
+    results["daily_trend"] = []
+    results["by_project"] = []
+    for r in rows:
+        tag = r["tag"]
+        if tag == "overview":
+            results["overview"] = {
+                "total_sessions": r["sessions"],
+                "total_minutes": r["total_minutes"],
+                "avg_duration": r["avg_duration"],
+                "avg_exchanges": r["avg_exchanges"],
+                "compacted_sessions": r["compacted_sessions"],
+            }
+        elif tag == "client":
+            results["time_per_client"].append({
+                "client": r["key"], "sessions": r["sessions"],
+                "total_minutes": r["total_minutes"], "avg_exchanges": r["avg_exchanges"],
+            })
+        elif tag == "project":
+            results["by_project"].append({
+                "project_name": r["key"], "sessions": r["sessions"],
+                "total_minutes": r["total_minutes"],
+            })
+        else:
+            results["daily_trend"].append({
+                "day": r["key"], "sessions": r["sessions"], "minutes": r["total_minutes"],
+            })
+
+    # Round trip 2 — top tools (period-aware), tool trends (this week vs
+    # last week), most-discussed topics (live — hooks write topics outside
+    # the indexer)
     rows = conn.execute(f"""
-        SELECT s.project_name, COUNT(*) as sessions,
-               SUM(s.duration_minutes) as total_minutes
-        FROM sessions s
-        {base_where}
-        GROUP BY s.project_name ORDER BY sessions DESC
-    """, base_params).fetchall()
-    results["by_project"] = [dict(r) for r in rows]
-
-    conn.close()
+        SELECT * FROM (
+            SELECT 'tools' as tag, r.tool_name as name,
+                   SUM(r.uses) as n1, SUM(r.sessions) as n2, NULL as source
+            FROM rollup_tool_daily r
+            {rollup_where}
+            GROUP BY r.tool_name ORDER BY n1 DESC LIMIT 15
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'trends', tool_name,
+                   SUM(CASE WHEN day >= :this_week THEN uses ELSE 0 END) as n1,
+                   SUM(CASE WHEN day >= :last_week AND day < :this_week THEN uses ELSE 0 END) as n2,
+                   NULL
+            FROM rollup_tool_daily
+            WHERE day >= :last_week
+            GROUP BY tool_name
+            HAVING n1 > 0 OR n2 > 0
+            ORDER BY n1 DESC LIMIT 15
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'topics', st.topic, COUNT(*) as n1, NULL, st.source
+            FROM session_topics st
+            JOIN sessions s ON s.session_id = st.session_id
+            {session_where}
+            GROUP BY st.topic
+            ORDER BY n1 DESC LIMIT 20
+        )
+    """, params).fetchall()
+
+    results["top_tools"] = []
+    results["tool_trends"] = []
+    results["top_topics"] = []
+    for r in rows:
+        tag = r["tag"]
+        if tag == "tools":
+            results["top_tools"].append({
+                "tool_name": r["name"], "total": r["n1"], "session_count": r["n2"],
+            })
+        elif tag == "trends":
+            results["tool_trends"].append({
+                "tool_name": r["name"], "this_week": r["n1"], "last_week": r["n2"],
+            })
+        else:
+            results["top_topics"].append({
+                "topic": r["name"], "mentions": r["n1"], "source": r["source"],
+            })
+
+    cache[cache_key] = results
+    _save_analytics_cache(cache_file, cache)
     return results
 
 
+# Per-row templates for the analytics tables
+_CLIENT_ROW = "  {client:25s}  {sessions:>4d} sessions  {hrs:>6.1f}h  avg {avg_exchanges} exchanges".format
+_PROJECT_ROW = "  {project_name:25s}  {sessions:>4d} sessions  {hrs:>6.1f}h".format
+_DAILY_ROW = "  {day}  {sessions:>3d} sessions  {hrs:>5.1f}h  {bar}".format
+_TOOL_ROW = "  {tool_name:25s}  {total:>6d} uses  ({session_count} sessions)".format
+_TREND_ROW = "  {0:25s}  {1:>5d} (was {2:>5d})  {3}".format
+_TOPIC_ROW = "  {mentions:>3d}×  {topic}".format
+_RULE = f"  {'─' * 46}"
+
+
 def format_analytics(data: dict) -> str:
     """Format analytics dict as readable CLI output."""
     lines = []
@@ -472,47 +797,35 @@ def format_analytics(data: dict) -> str:
     # Time per client
     tpc = data.get("time_per_client", [])
     if tpc:
-        lines.append(f"\n  ⏱  Time per client")
-        lines.append(f"  {'─' * 46}")
-        for r in tpc:
-            hrs = round((r["total_minutes"] or 0) / 60, 1)
-            lines.append(f"  {r['client']:25s}  {r['sessions']:>4d} sessions  "
-                          f"{hrs:>6.1f}h  avg {r['avg_exchanges']} exchanges")
+        lines += ["\n  ⏱  Time per client", _RULE]
+        lines += [_CLIENT_ROW(hrs=round((r["total_minutes"] or 0) / 60, 1), **r) for r in tpc]
 
     # By project
     bp = data.get("by_project", [])
     if bp:
-        lines.append(f"\n  📁 By project")
-        lines.append(f"  {'─' * 46}")
-        for r in bp:
-            hrs = round((r["total_minutes"] or 0) / 60, 1)
-            lines.append(f"  {r['project_name']:25s}  {r['sessions']:>4d} sessions  {hrs:>6.1f}h")
+        lines += ["\n  📁 By project", _RULE]
+        lines += [_PROJECT_ROW(hrs=round((r["total_minutes"] or 0) / 60, 1), **r) for r in bp]
 
     # Daily trend
     dt = data.get("daily_trend", [])
     if dt:
-        lines.append(f"\n  📈 Daily trend (last 14 days)")
-        lines.append(f"  {'─' * 46}")
+        lines += ["\n  📈 Daily trend (last 14 days)", _RULE]
         for r in dt:
             mins = r["minutes"] or 0
-            bar = "█" * min(int(mins / 15), 40)
-            lines.append(f"  {r['day']}  {r['sessions']:>3d} sessions  "
-                          f"{round(mins / 60, 1):>5.1f}h  {bar}")
+            lines.append(_DAILY_ROW(day=r["day"], sessions=r["sessions"],
+                                    hrs=round(mins / 60, 1),
+                                    bar="█" * min(int(mins / 15), 40)))
 
     # Top tools
     tt = data.get("top_tools", [])
     if tt:
-        lines.append(f"\n  🔧 Top tools")
-        lines.append(f"  {'─' * 46}")
-        for r in tt:
-            lines.append(f"  {r['tool_name']:25s}  {r['total']:>6d} uses  "
-                          f"({r['session_count']} sessions)")
+        lines += ["\n  🔧 Top tools", _RULE]
+        lines += [_TOOL_ROW(**r) for r in tt]
 
     # Tool trends
     trends = data.get("tool_trends", [])
     if trends:
-        lines.append(f"\n  📊 Tool trends (this week vs last)")
-        lines.append(f"  {'─' * 46}")
+        lines += ["\n  📊 Tool trends (this week vs last)", _RULE]
         for r in trends:
             tw = r["this_week"] or 0
             lw = r["last_week"] or 0
@@ -524,15 +837,13 @@ def format_analytics(data: dict) -> str:
                 change = "NEW"
             else:
                 change = ""
-            lines.append(f"  {r['tool_name']:25s}  {tw:>5d} (was {lw:>5d})  {change}")
+            lines.append(_TREND_ROW(r["tool_name"], tw, lw, change))
 
     # Top topics
     topics = data.get("top_topics", [])
     if topics:
-        lines.append(f"\n  💬 Most discussed topics")
-        lines.append(f"  {'─' * 46}")
-        for r in topics[:10]:
-            lines.append(f"  {r['mentions']:>3d}×  {r['topic']}")
+        lines += ["\n  💬 Most discussed topics", _RULE]
+        lines += [_TOPIC_ROW(**r) for r in topics[:10]]
 
     return "\n".join(lines)
 
@@ -541,11 +852,84 @@ def format_analytics(data: dict) -> str:
 # C. Cross-session synthesis — Haiku
 # ---------------------------------------------------------------------------
 
+# Ranked FTS lookup for synthesis. Kept as one constant string so the
+# shared connection's statement cache reuses the prepared plan per call.
+# No snippet(): the excerpts come from the JSONL files, not the index.
+_FTS_SYNTH_SQL = """
+    SELECT s.session_id, s.file_path, s.title_display, s.project_name,
+           s.client, s.start_time, s.exchange_count, s.duration_minutes
+    FROM session_content
+    JOIN sessions s ON s.session_id = session_content.session_id
+    WHERE session_content MATCH ?
+    ORDER BY rank
+    LIMIT ?
+"""
+
+# Input budget for the excerpts sent to Haiku (~20K chars of English)
+SYNTHESIS_TOKEN_BUDGET = 5000
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count — ~4 chars/token for English prose and code."""
+    return len(text) // 4 + 1
+
+
+def _collapse_tool_runs(text: str) -> str:
+    """Drop consecutive repeats of the same tool-call summary line."""
+    out = []
+    for line in text.split("\n"):
+        if out and line == out[-1] and line.startswith("[") and line.endswith("]"):
+            continue
+        out.append(line)
+    return "\n".join(out)
+
+
+def _select_excerpts(query: str, exchange_lists: list[list[dict]],
+                     budget: int) -> set[tuple[int, int]]:
+    """Pick (session_index, exchange_index) pairs to send for synthesis.
+
+    Exchanges are scored by TF-IDF-style overlap with the query words — a
+    word found in few exchanges counts more — and taken best-first until
+    the token budget is spent. Ties go to the higher-ranked session.
+    """
+    words = {w.lower() for w in query.split() if len(w) > 2} or {query.lower()}
+    texts = {
+        (i, j): (ex["user"] + "\n" + ex["assistant"]).lower()
+        for i, exchanges in enumerate(exchange_lists)
+        for j, ex in enumerate(exchanges)
+    }
+    idf = {}
+    for w in words:
+        df = sum(1 for t in texts.values() if w in t)
+        if df:
+            idf[w] = math.log(1 + len(texts) / df)
+
+    def score(key):
+        return sum(weight for w, weight in idf.items() if w in texts[key])
+
+    selected = set()
+    used = 0
+    for key in sorted(texts, key=lambda k: (-score(k), k)):
+        i, j = key
+        ex = exchange_lists[i][j]
+        cost = _estimate_tokens(ex["user"]) + _estimate_tokens(_collapse_tool_runs(ex["assistant"]))
+        if not any(k[0] == i for k in selected):
+            cost += 20  # session header + separator
+        if selected and used + cost > budget:
+            continue
+        selected.add(key)
+        used += cost
+    return selected
+
+
 def synthesize(query: str, limit: int = 10, max_excerpt_chars: int = 2000,
-               db_path: Path = None) -> dict:
+               db_path: Path = None, stream: bool = False) -> dict:
     """Search sessions, extract relevant exchanges, synthesize with Haiku.
 
     Returns dict with synthesis text + source session references.
+    With stream=True, "synthesis" is None and "stream" is an iterator of
+    text chunks — the API call starts when it's first iterated, so callers
+    can print the sources first and the answer as it generates.
     Requires ANTHROPIC_API_KEY environment variable and the anthropic SDK.
     """
     if db_path is None:
@@ -564,6 +948,16 @@ def synthesize(query: str, limit: int = 10, max_excerpt_chars: int = 2000,
                 messages=[{"role": "user", "content": prompt}]
             )
             return response.content[0].text
+
+        def haiku_stream(prompt, system="You are a fast, precise assistant.", max_tokens=2048):
+            client = Anthropic()
+            with client.messages.stream(
+                model="claude-3-5-haiku-20241022",
+                max_tokens=max_tokens,
+                system=system,
+                messages=[{"role": "user", "content": prompt}]
+            ) as response:
+                yield from response.text_stream
     except ImportError:
         return {
             "error": "Synthesis requires the Anthropic SDK. Install with: pip install anthropic",
@@ -579,21 +973,9 @@ def synthesize(query: str, limit: int = 10, max_excerpt_chars: int = 2000,
         }
 
     # Step 1: Search for matching sessions via FTS
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
-
-    rows = conn.execute("""
-        SELECT s.session_id, s.file_path, s.title_display, s.project_name,
-               s.client, s.start_time, s.exchange_count, s.duration_minutes,
-               snippet(session_content, 1, '>>>', '<<<', '...', 30) as snippet
-        FROM session_content
-        JOIN sessions s ON s.session_id = session_content.session_id
-        WHERE session_content MATCH ?
-        ORDER BY rank
-        LIMIT ?
-    """, (query, limit)).fetchall()
+    conn = _get_conn(db_path)
 
-    conn.close()
+    rows = conn.execute(_FTS_SYNTH_SQL, (query, limit)).fetchall()
 
     if not rows:
         return {
@@ -602,8 +984,18 @@ def synthesize(query: str, limit: int = 10, max_excerpt_chars: int = 2000,
             "synthesis": None,
         }
 
-    # Step 2: Extract relevant exchanges from each matching session
-    session_excerpts = []
+    # Step 2: Extract relevant exchanges from each matching session.
+    # Each extraction is mostly file I/O, so read the sessions concurrently;
+    # map() keeps results in rank order.
+    matcher = _QueryMatcher(query)
+    with ThreadPoolExecutor(max_workers=min(8, len(rows))) as pool:
+        exchange_lists = list(pool.map(
+            lambda row: extract_exchanges(
+                row["file_path"], query=matcher, limit=5, max_chars=max_excerpt_chars
+            ),
+            rows,
+        ))
+
     sources = []
     for row in rows:
         info = dict(row)
@@ -615,18 +1007,20 @@ def synthesize(query: str, limit: int = 10, max_excerpt_chars: int = 2000,
             "client": info.get("client", ""),
         })
 
-        exchanges = extract_exchanges(
-            info["file_path"], query=query, limit=5, max_chars=max_excerpt_chars
-        )
-
-        if exchanges:
+    # Keep the most query-relevant exchanges that fit the token budget,
+    # rendered per session in rank order, chronological within a session
+    selected = _select_excerpts(query, exchange_lists, SYNTHESIS_TOKEN_BUDGET)
+    session_excerpts = []
+    for i, (row, exchanges) in enumerate(zip(rows, exchange_lists)):
+        keep = [ex for j, ex in enumerate(exchanges) if (i, j) in selected]
+        if keep:
             excerpt_lines = []
-            title = info.get("title_display") or info["session_id"][:8]
-            date = (info.get("start_time") or "")[:10]
+            title = row["title_display"] or row["session_id"][:8]
+            date = (row["start_time"] or "")[:10]
             excerpt_lines.append(f"### Session: {title} ({date})")
-            for ex in exchanges:
+            for ex in keep:
                 excerpt_lines.append(f"User: {ex['user']}")
-                excerpt_lines.append(f"Assistant: {ex['assistant']}")
+                excerpt_lines.append(f"Assistant: {_collapse_tool_runs(ex['assistant'])}")
                 excerpt_lines.append("")
             session_excerpts.append("\n".join(excerpt_lines))
 
@@ -639,10 +1033,8 @@ def synthesize(query: str, limit: int = 10, max_excerpt_chars: int = 2000,
 
     # Step 3: Build synthesis prompt
     formatted_excerpts = "\n---\n".join(session_excerpts)
-
-    # Trim total context to ~20K chars for Haiku
-    if len(formatted_excerpts) > 20000:
-        formatted_excerpts = formatted_excerpts[:20000] + "\n[...truncated]"
+    if len(selected) < sum(len(exchanges) for exchanges in exchange_lists):
+        formatted_excerpts += "\n[...truncated]"
 
     system_prompt = "You are analyzing Claude Code session excerpts. Be specific — reference actual solutions, file names, tools used. Keep it concise (under 500 words)."
 
@@ -658,6 +1050,15 @@ def synthesize(query: str, limit: int = 10, max_excerpt_chars: int = 2000,
 {formatted_excerpts}"""
 
     # Step 4: Call Haiku
+    if stream:
+        return {
+            "query": query,
+            "sessions": sources,
+            "synthesis": None,
+            "stream": haiku_stream(user_prompt, system=system_prompt, max_tokens=2048),
+            "excerpt_count": len(session_excerpts),
+        }
+
     synthesis = haiku_ask(user_prompt, system=system_prompt, max_tokens=2048)
 
     return {
@@ -689,14 +1090,26 @@ def format_synthesis(result: dict) -> str:
             lines.append(f"    {s['date']}  {title}")
             lines.append(f"             → claude --resume {s['session_id']}")
 
-    # Synthesis
+    # Synthesis (a streamed body is printed by the caller after this)
     if result.get("synthesis"):
         lines.append(f"\n  {'─' * 48}\n")
         lines.append(result["synthesis"])
+    elif result.get("stream"):
+        lines.append(f"\n  {'─' * 48}\n")
 
     return "\n".join(lines)
 
 
+def print_synthesis_stream(result: dict):
+    """Write a streamed synthesis body to stdout as chunks arrive."""
+    if not result.get("stream"):
+        return
+    for text in result["stream"]:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+    print()
+
+
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
@@ -753,8 +1166,9 @@ def main():
         print(format_analytics(result))
 
     elif args.command == "synthesize":
-        result = synthesize(args.query, limit=args.limit, db_path=db_path)
+        result = synthesize(args.query, limit=args.limit, db_path=db_path, stream=True)
         print(format_synthesis(result))
+        print_synthesis_stream(result)
 
 
 if __name__ == "__main__":
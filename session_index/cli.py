@@ -9,6 +9,7 @@ Usage:
     sessions "webhook" --context                # search with conversation excerpts
     sessions context a5b111c6 "failure"         # conversation around matches
     sessions context a5b111c6                   # all exchanges
+    sessions context a5b111c6,7b22239e --multi  # several sessions at once
     sessions analytics --week                   # this week's stats
     sessions analytics --client "Acme"          # per-client stats
     sessions synthesize "form automation"       # cross-session synthesis
@@ -24,77 +25,96 @@ Usage:
 """
 
 import sys
-import json
 from pathlib import Path
-from datetime import datetime, timedelta
 
 try:
     from . import config
-    from .search import SessionSearch, format_result
-    from .analyzer import (
-        get_context, format_context,
-        analytics, format_analytics,
-        synthesize, format_synthesis,
-    )
 except ImportError:
     import config
-    from search import SessionSearch, format_result
-    from analyzer import (
-        get_context, format_context,
-        analytics, format_analytics,
-        synthesize, format_synthesis,
-    )
 
 
-SUBCOMMANDS = {
-    'context', 'analytics', 'synthesize', 'recent', 'find',
-    'tools', 'topics', 'stats', 'index', 'search',
-}
+# search, analyzer and indexer are imported per command, so `--help`,
+# `stats` and friends don't pay for modules they never call.
 
+def _search():
+    try:
+        from . import search
+    except ImportError:
+        import search
+    return search
 
-def main():
-    import argparse
 
-    parser = argparse.ArgumentParser(
-        prog='sessions',
-        description='Search and analyze your Claude Code sessions',
-        usage='sessions "query" | sessions <command> [options]',
-    )
-    parser.add_argument('--db-path', type=str, default=None,
-                        help='Path to sessions.db (overrides config)')
+def _analyzer():
+    try:
+        from . import analyzer
+    except ImportError:
+        import analyzer
+    return analyzer
 
-    subparsers = parser.add_subparsers(dest='command')
 
-    # search (also the default when no subcommand given)
+def _indexer():
+    try:
+        from . import indexer
+    except ImportError:
+        import indexer
+    return indexer
+
+
+# Box-drawing rules, built once rather than per printed row
+_EXCHANGE_FOOTER = f"    └{'─' * 42}"
+_CARD_FOOTER = f"╰{'─' * 48}"
+_DOUBLE_RULE = '═' * 40
+_STATS_RULE = f"  {'─' * 36}"
+# Headers pad `text + ' ─'` with '─' to a fixed column (always >= 1 dash)
+
+
+def _preview(text: str, width: int = 250) -> str:
+    """First `width` chars of a message, on one line."""
+    if len(text) > width:
+        text = text[:width]
+    # No copy when there's no newline — replace() returns the same object
+    return text.replace('\n', ' ')
+
+
+# One builder per subcommand, so a run only constructs the parser it uses
+def _add_search(subparsers):
+    # also the default when no subcommand given
     sp = subparsers.add_parser('search', help='Full-text search')
     sp.add_argument('query', help='Search query')
     sp.add_argument('-n', '--limit', type=int, default=20)
     sp.add_argument('--context', action='store_true',
                     help='Show conversation exchanges inline')
 
-    # context
+
+def _add_context(subparsers):
     sp = subparsers.add_parser('context', help='Conversation context for a session')
     sp.add_argument('session_id', help='Session ID (full or prefix)')
     sp.add_argument('query', nargs='?', default=None, help='Filter to matching exchanges')
     sp.add_argument('-n', '--limit', type=int, default=10, help='Max exchanges')
+    sp.add_argument('--multi', action='store_true',
+                    help='Treat session_id as a comma-separated list of IDs')
+
 
-    # analytics
+def _add_analytics(subparsers):
     sp = subparsers.add_parser('analytics', help='Session analytics')
     sp.add_argument('--client', help='Filter by client')
     sp.add_argument('--project', help='Filter by project')
     sp.add_argument('--week', action='store_true', help='This week only')
     sp.add_argument('--month', action='store_true', help='This month only')
 
-    # synthesize
+
+def _add_synthesize(subparsers):
     sp = subparsers.add_parser('synthesize', help='Cross-session synthesis')
     sp.add_argument('query', help='Topic to synthesize across sessions')
     sp.add_argument('--limit', type=int, default=10, help='Max sessions to analyze')
 
-    # recent
+
+def _add_recent(subparsers):
     sp = subparsers.add_parser('recent', help='Recent sessions')
     sp.add_argument('n', nargs='?', type=int, default=10)
 
-    # find
+
+def _add_find(subparsers):
     sp = subparsers.add_parser('find', help='Filter sessions')
     sp.add_argument('--client', help='Filter by client')
     sp.add_argument('--tag', help='Filter by tag')
@@ -108,40 +128,117 @@ def main():
     sp.add_argument('--compacted', action='store_true', help='Only compacted sessions')
     sp.add_argument('-n', '--limit', type=int, default=20)
 
-    # tools
+
+def _add_tools(subparsers):
     sp = subparsers.add_parser('tools', help='Tool usage')
     sp.add_argument('tool_name', nargs='?', help='Specific tool')
 
-    # topics
+
+def _add_topics(subparsers):
     sp = subparsers.add_parser('topics', help='Topic timeline for a session')
     sp.add_argument('session_id', help='Session ID (full or prefix)')
 
-    # stats
+
+def _add_stats(subparsers):
     subparsers.add_parser('stats', help='Database overview')
 
-    # index
+
+def _add_index(subparsers):
     sp = subparsers.add_parser('index', help='Index sessions')
     sp.add_argument('--backfill', action='store_true', help='Re-index everything')
     sp.add_argument('--session', metavar='ID', help='Index a single session')
 
-    # --- Default to search if first arg isn't a subcommand ---
-    # Intercept before argparse: if the first real arg isn't a known
-    # subcommand or flag, treat the whole thing as a search query.
-    raw_args = sys.argv[1:]
-    if raw_args and raw_args[0] not in SUBCOMMANDS and not raw_args[0].startswith('-'):
-        # Bare text = search. Rebuild as: search "the query" [flags]
-        # Once we hit a flag (starts with -), everything after is flags/values.
-        query_parts = []
-        flags = []
-        in_flags = False
-        for arg in raw_args:
-            if arg.startswith('-'):
-                in_flags = True
-            if in_flags:
-                flags.append(arg)
-            else:
-                query_parts.append(arg)
-        sys.argv = [sys.argv[0], 'search', ' '.join(query_parts)] + flags
+
+_SUBPARSERS = {
+    'search': _add_search,
+    'context': _add_context,
+    'analytics': _add_analytics,
+    'synthesize': _add_synthesize,
+    'recent': _add_recent,
+    'find': _add_find,
+    'tools': _add_tools,
+    'topics': _add_topics,
+    'stats': _add_stats,
+    'index': _add_index,
+}
+
+SUBCOMMANDS = set(_SUBPARSERS)
+
+
+def _version() -> str:
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+        return version('claude-session-index')
+    except (ImportError, PackageNotFoundError):
+        from session_index import __version__
+        return __version__
+
+
+def _sniff_subcommand(argv: list[str]):
+    """First positional arg, skipping the global --db-path and its value."""
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == '--db-path':
+            i += 2
+            continue
+        if not arg.startswith('-'):
+            return arg
+        i += 1
+    return None
+
+
+def _fast_parse(argv: list[str]):
+    """Parse the flag-free forms of the common commands without argparse.
+
+    Covers `sessions "query"`, `recent [N]`, `stats` and `tools [name]`.
+    Returns None for anything else — flags, other commands, odd input —
+    which then goes through the full argparse path.
+    """
+    from types import SimpleNamespace
+
+    if any(arg.startswith('-') for arg in argv):
+        return None
+    command, rest = argv[0], argv[1:]
+    if command == 'search' and len(rest) == 1:
+        return SimpleNamespace(command='search', db_path=None, query=rest[0],
+                               limit=20, context=False)
+    # ASCII only: isdigit() also accepts '²' (which int() rejects) and
+    # other scripts' digits; those go through argparse
+    if command == 'recent' and (not rest or (len(rest) == 1 and rest[0].isascii()
+                                             and rest[0].isdigit())):
+        return SimpleNamespace(command='recent', db_path=None,
+                               n=int(rest[0]) if rest else 10)
+    if command == 'stats' and not rest:
+        return SimpleNamespace(command='stats', db_path=None)
+    if command == 'tools' and len(rest) <= 1:
+        return SimpleNamespace(command='tools', db_path=None,
+                               tool_name=rest[0] if rest else None)
+    return None
+
+
+def _parse_args():
+    """Full argparse parse of sys.argv."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='sessions',
+        description='Search and analyze your Claude Code sessions',
+        usage='sessions "query" | sessions <command> [options]',
+    )
+    parser.add_argument('--db-path', type=str, default=None,
+                        help='Path to sessions.db (overrides config)')
+
+    subparsers = parser.add_subparsers(dest='command')
+
+    # Build only the subcommand being run; all of them when it's unknown,
+    # so argparse can report the error with the full choice list
+    command = _sniff_subcommand(sys.argv[1:])
+    if command in _SUBPARSERS:
+        _SUBPARSERS[command](subparsers)
+    else:
+        for add in _SUBPARSERS.values():
+            add(subparsers)
 
     args = parser.parse_args()
 
@@ -149,76 +246,111 @@ def main():
         parser.print_help()
         sys.exit(0)
 
+    return args
+
+
+def main():
+    # Fast paths — no argparse for bare `sessions`, --help and --version
+    raw_args = sys.argv[1:]
+    if not raw_args or raw_args[0] in ('-h', '--help'):
+        print(__doc__.strip())
+        sys.exit(0)
+    if raw_args[0] == '--version':
+        print(f"sessions {_version()}")
+        sys.exit(0)
+
+    # --- Default to search if first arg isn't a subcommand ---
+    # Intercept before argparse: if the first real arg isn't a known
+    # subcommand or flag, treat the whole thing as a search query.
+    if raw_args[0] not in SUBCOMMANDS and not raw_args[0].startswith('-'):
+        # Bare text = search. Rebuild as: search "the query" [flags]
+        # Once we hit a flag (starts with -), everything after is flags/values.
+        first_flag = next(
+            (i for i, arg in enumerate(raw_args) if arg.startswith('-')), len(raw_args)
+        )
+        sys.argv = ([sys.argv[0], 'search', ' '.join(raw_args[:first_flag])]
+                    + raw_args[first_flag:])
+
+    args = _fast_parse(sys.argv[1:]) or _parse_args()
+
     # Resolve paths
     db_path = Path(args.db_path) if args.db_path else config.get_db_path()
-    config.ensure_indexed(db_path)
+    if args.command != 'index':
+        # First-run auto-index; `index` does its own indexing
+        config.ensure_indexed(db_path)
 
     # --- Dispatch ---
+    # Listing commands collect their lines in `out`, written in one go below
+    out = []
 
     if args.command == 'search':
-        searcher = SessionSearch(db_path=db_path)
-        searcher.connect()
-        try:
+        search = _search()
+        with search.SessionSearch(db_path=db_path) as searcher:
             results = searcher.search(args.query, args.limit)
             if not results:
                 print(f"No results for: {args.query}")
                 return
-            print(f"\n🔍 {len(results)} results for \"{args.query}\"\n")
-            for r in results:
-                print(format_result(r))
+            out.append(f"\n🔍 {len(results)} results for \"{args.query}\"\n")
+            contexts = [{}] * len(results)
+            if args.context:
+                analyzer = _analyzer()
+                contexts = analyzer.get_contexts([r['session_id'] for r in results],
+                                                 query=args.query, limit=3,
+                                                 conn=searcher.conn)
+            fmt, append = search.format_result, out.append
+            for r, ctx in zip(results, contexts):
+                append(fmt(r))
                 if args.context:
-                    ctx = get_context(r['session_id'], query=args.query, limit=3, db_path=db_path)
                     if ctx.get('exchanges'):
                         for ex in ctx['exchanges']:
-                            ts = ex['timestamp'][:16] if ex['timestamp'] else ''
-                            try:
-                                dt = datetime.fromisoformat(ts)
-                                ts_display = dt.strftime("%b %d, %H:%M")
-                            except (ValueError, TypeError):
-                                ts_display = ts
-                            print(f"    ┌─ {ts_display} {'─' * max(1, 36 - len(ts_display))}")
-                            user_preview = ex['user'][:250].replace('\n', ' ')
-                            asst_preview = ex['assistant'][:250].replace('\n', ' ')
-                            print(f"    │ 🧑 {user_preview}")
-                            print(f"    │ 🤖 {asst_preview}")
-                            print(f"    └{'─' * 42}")
-                print()
-        finally:
-            searcher.close()
+                            ts_display = analyzer.format_timestamp(ex['timestamp'])
+                            append(
+                                f"    ┌─ {ts_display + ' ─':─<37}\n"
+                                f"    │ 🧑 {_preview(ex['user'])}\n"
+                                f"    │ 🤖 {_preview(ex['assistant'])}\n"
+                                f"{_EXCHANGE_FOOTER}"
+                            )
+                append('')
 
     elif args.command == 'context':
-        result = get_context(args.session_id, query=args.query,
-                             limit=args.limit, db_path=db_path)
-        print(format_context(result))
+        analyzer = _analyzer()
+        if args.multi:
+            ids = [sid.strip() for sid in args.session_id.split(',') if sid.strip()]
+            for result in analyzer.get_contexts(ids, query=args.query,
+                                                limit=args.limit, db_path=db_path):
+                print(analyzer.format_context(result))
+        else:
+            result = analyzer.get_context(args.session_id, query=args.query,
+                                          limit=args.limit, db_path=db_path)
+            print(analyzer.format_context(result))
 
     elif args.command == 'analytics':
-        result = analytics(
+        analyzer = _analyzer()
+        result = analyzer.analytics(
             client=args.client, project=args.project,
             week=args.week, month=args.month,
             db_path=db_path,
         )
-        print(format_analytics(result))
+        print(analyzer.format_analytics(result))
 
     elif args.command == 'synthesize':
-        result = synthesize(args.query, limit=args.limit, db_path=db_path)
-        print(format_synthesis(result))
+        analyzer = _analyzer()
+        result = analyzer.synthesize(args.query, limit=args.limit, db_path=db_path, stream=True)
+        print(analyzer.format_synthesis(result))
+        analyzer.print_synthesis_stream(result)
 
     elif args.command == 'recent':
-        searcher = SessionSearch(db_path=db_path)
-        searcher.connect()
-        try:
+        search = _search()
+        with search.SessionSearch(db_path=db_path) as searcher:
             results = searcher.recent(args.n)
-            print(f"\n📋 Last {len(results)} sessions\n")
+            out.append(f"\n📋 Last {len(results)} sessions\n")
+            fmt = search.format_result
             for r in results:
-                print(format_result(r))
-                print()
-        finally:
-            searcher.close()
+                out += (fmt(r), '')
 
     elif args.command == 'find':
-        searcher = SessionSearch(db_path=db_path)
-        searcher.connect()
-        try:
+        search = _search()
+        with search.SessionSearch(db_path=db_path) as searcher:
             results = searcher.find(
                 client=args.client, tag=args.tag, tool=args.tool,
                 agent=args.agent, date=args.date, week=args.week,
@@ -231,120 +363,92 @@ def main():
             if not results:
                 print("No sessions match those filters.")
                 return
-            print(f"\n📋 {len(results)} sessions\n")
+            out.append(f"\n📋 {len(results)} sessions\n")
+            fmt = search.format_result
             for r in results:
-                print(format_result(r))
-                print()
-        finally:
-            searcher.close()
+                out += (fmt(r), '')
 
     elif args.command == 'tools':
-        searcher = SessionSearch(db_path=db_path)
-        searcher.connect()
-        try:
+        search = _search()
+        with search.SessionSearch(db_path=db_path) as searcher:
             tool_name = getattr(args, 'tool_name', None)
             results = searcher.tools_usage(tool_name)
             if tool_name:
-                print(f"\n🔧 Sessions using '{tool_name}'\n")
+                out.append(f"\n🔧 Sessions using '{tool_name}'\n")
                 for r in results:
                     sid = r['session_id'][:8]
-                    title = r.get('title_display') or r.get('title') or '(unnamed)'
-                    print(f"  ◆ {sid} · {r['tool_name']} ×{r['use_count']}  {title}")
+                    out.append(f"  ◆ {sid} · {r['tool_name']} ×{r['use_count']}  {r['display_title']}")
             else:
-                print(f"\n🔧 Top tools across all sessions\n")
+                out.append(f"\n🔧 Top tools across all sessions\n")
                 for r in results:
-                    print(f"  {r['tool_name']:25s}  {r['total']:>6d} uses  ({r['session_count']} sessions)")
-        finally:
-            searcher.close()
+                    out.append(f"  {r['tool_name']:25s}  {r['total']:>6d} uses  ({r['session_count']} sessions)")
 
     elif args.command == 'topics':
-        searcher = SessionSearch(db_path=db_path)
-        searcher.connect()
-        try:
-            sid = args.session_id
-            if len(sid) < 36:
-                row = searcher.conn.execute(
-                    "SELECT session_id FROM sessions WHERE session_id LIKE ?", (f"{sid}%",)
-                ).fetchone()
-                if row:
-                    sid = row['session_id']
-                else:
-                    print(f"No session found matching: {sid}")
-                    return
+        search = _search()
+        with search.SessionSearch(db_path=db_path) as searcher:
+            sid = searcher.resolve_session_id(args.session_id)
+            if sid is None:
+                print(f"No session found matching: {args.session_id}")
+                return
 
-            topics = searcher.topics(sid)
+            session, topics = searcher.topic_timeline(sid)
             if not topics:
                 print(f"No topics recorded for session {sid[:8]}")
                 return
 
-            session = searcher.conn.execute(
-                "SELECT title_display, start_time, project_name FROM sessions WHERE session_id=?",
-                (sid,)
-            ).fetchone()
-
             if session:
                 title = session['title_display'] or '(unnamed)'
-                print(f"\n╭─── {title} {'─' * max(1, 44 - len(title))}")
+                out.append(f"\n╭─── {title + ' ─':─<45}")
                 meta = []
                 if session['start_time']:
                     meta.append(session['start_time'][:16])
                 if session['project_name']:
                     meta.append(session['project_name'])
-                print(f"│ {' · '.join(meta)}")
-                print(f"╰{'─' * 48}")
+                out.append(f"│ {' · '.join(meta)}")
+                out.append(_CARD_FOOTER)
 
-            print(f"\n💬 Topic timeline ({len(topics)} entries)\n")
+            out.append(f"\n💬 Topic timeline ({len(topics)} entries)\n")
             for t in topics:
                 ts = t['captured_at'][:16] if t['captured_at'] else ''
                 ex = f" (exchange {t['exchange_number']})" if t['exchange_number'] else ''
                 src = t['source']
-                print(f"  [{src:20s}] {ts}{ex}")
-                print(f"                       {t['topic']}")
-                print()
-        finally:
-            searcher.close()
+                out.append(f"  [{src:20s}] {ts}{ex}")
+                out.append(f"                       {t['topic']}")
+                out.append('')
 
     elif args.command == 'stats':
-        searcher = SessionSearch(db_path=db_path)
-        searcher.connect()
-        try:
+        search = _search()
+        with search.SessionSearch(db_path=db_path) as searcher:
             stats = searcher.stats()
-            print(f"\n📊 Database overview")
-            print(f"{'═' * 40}")
-            print(f"  Sessions:  {stats.get('total_sessions', 0)}")
-            print(f"  Topics:    {stats.get('total_topics', 0)}")
-            print(f"  Tools:     {stats.get('total_tools', 0)} distinct")
-            print(f"  Agents:    {stats.get('total_agents', 0)} distinct")
+            out.append(f"\n📊 Database overview")
+            out.append(_DOUBLE_RULE)
+            out.append(f"  Sessions:  {stats.get('total_sessions', 0)}")
+            out.append(f"  Topics:    {stats.get('total_topics', 0)}")
+            out.append(f"  Tools:     {stats.get('total_tools', 0)} distinct")
+            out.append(f"  Agents:    {stats.get('total_agents', 0)} distinct")
             dr = stats.get('date_range', {})
             if dr.get('earliest'):
-                print(f"  Range:     {dr['earliest']} → {dr['latest']}")
+                out.append(f"  Range:     {dr['earliest']} → {dr['latest']}")
             if stats.get('by_project'):
-                print(f"\n  📁 By project")
-                print(f"  {'─' * 36}")
-                for name, cnt in list(stats['by_project'].items())[:10]:
-                    print(f"  {name:25s}  {cnt:>5d}")
+                out.append(f"\n  📁 By project")
+                out.append(_STATS_RULE)
+                for name, cnt in stats['by_project'].items():
+                    out.append(f"  {name:25s}  {cnt:>5d}")
             if stats.get('top_tools'):
-                print(f"\n  🔧 Top tools")
-                print(f"  {'─' * 36}")
-                for name, cnt in list(stats['top_tools'].items())[:10]:
-                    print(f"  {name:25s}  {cnt:>5d}")
-            print()
-        finally:
-            searcher.close()
+                out.append(f"\n  🔧 Top tools")
+                out.append(_STATS_RULE)
+                for name, cnt in stats['top_tools'].items():
+                    out.append(f"  {name:25s}  {cnt:>5d}")
+            out.append('')
 
     elif args.command == 'index':
+        # A plain `index` on an empty database is a first run: take the
+        # bulk backfill path rather than upserting every file one by one
+        backfill = args.backfill or (not args.session and config.index_is_empty(db_path))
+        indexer = _indexer().SessionIndexer(db_path=db_path)
+        indexer.connect(bulk_mode=backfill)
         try:
-            from session_index.indexer import SessionIndexer
-        except ImportError:
-            try:
-                from .indexer import SessionIndexer
-            except ImportError:
-                from indexer import SessionIndexer
-
-        indexer = SessionIndexer(db_path=db_path)
-        indexer.connect()
-        try:
-            if args.backfill:
+            if backfill:
                 indexer.backfill_all()
             elif args.session:
                 if indexer.index_session(session_id=args.session):
@@ -359,6 +463,9 @@ def main():
         finally:
             indexer.close()
 
+    if out:
+        sys.stdout.write("\n".join(out) + "\n")
+
 
 if __name__ == "__main__":
     main()
@@ -22,17 +22,25 @@ DEFAULTS = {
 
 CONFIG_FILE = Path.home() / ".session-index" / "config.json"
 
+ENV_MAP = {
+    "SESSION_INDEX_PROJECTS": "projects_dir",
+    "SESSION_INDEX_DB": "db_path",
+    "SESSION_INDEX_TOPICS": "topics_dir",
+}
+
 _cached_config: Optional[dict] = None
 
+# (projects_dir, dir mtime) → auto-generated project names
+_project_names_cache: dict[tuple[str, int], dict[str, str]] = {}
+
 
 def _load_config_file() -> dict:
     """Load config from ~/.session-index/config.json if it exists."""
-    if CONFIG_FILE.exists():
-        try:
-            return json.loads(CONFIG_FILE.read_text())
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {}
+    # Just try the read: a missing file costs one failed open(), no stat()
+    try:
+        return json.loads(CONFIG_FILE.read_bytes())
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError):
+        return {}
 
 
 def get_config() -> dict:
@@ -51,15 +59,10 @@ def get_config() -> dict:
             config[key] = value
 
     # Layer on environment variables
-    env_map = {
-        "SESSION_INDEX_PROJECTS": "projects_dir",
-        "SESSION_INDEX_DB": "db_path",
-        "SESSION_INDEX_TOPICS": "topics_dir",
-    }
-    for env_key, config_key in env_map.items():
-        val = os.environ.get(env_key)
-        if val:
-            config[config_key] = val
+    config.update({
+        config_key: val for env_key, config_key in ENV_MAP.items()
+        if (val := os.environ.get(env_key))
+    })
 
     _cached_config = config
     return config
@@ -107,18 +110,32 @@ def get_project_names() -> dict[str, str]:
 
     # Auto-generate from directory names
     projects_dir = get_projects_dir()
+    try:
+        key = (str(projects_dir), os.stat(projects_dir).st_mtime_ns)
+    except OSError:
+        return {}
+    cached = _project_names_cache.get(key)
+    if cached is not None:
+        return cached
+
     mapping = {}
-    if projects_dir.exists():
-        for d in projects_dir.iterdir():
-            if d.is_dir():
-                name = d.name
+    try:
+        with os.scandir(projects_dir) as it:
+            for entry in it:
+                # dirent type bit — only symlinks need a stat()
+                if not entry.is_dir():
+                    continue
+                name = entry.name
                 # Take the last meaningful segment
                 parts = [p for p in name.split("-") if p]
                 if parts:
                     # Use last 1-2 segments as friendly name
                     friendly = " ".join(parts[-2:]) if len(parts) > 1 else parts[-1]
                     mapping[name] = friendly
+    except OSError:
+        return {}
 
+    _project_names_cache[key] = mapping
     return mapping
 
 
@@ -132,33 +149,36 @@ def init_config():
     return True
 
 
-def ensure_indexed(db_path: Path = None) -> bool:
-    """Auto-index on first use if database is empty or missing.
-
-    Returns True if backfill was triggered.
-    """
+def index_is_empty(db_path: Path = None) -> bool:
+    """True if the database is missing or has no indexed sessions yet."""
     import sqlite3
 
     if db_path is None:
         db_path = get_db_path()
 
-    needs_backfill = False
     if not db_path.exists():
-        needs_backfill = True
-    else:
+        return True
+    try:
+        # Read-only probe for a single row — COUNT(*) would walk the
+        # whole table on every CLI invocation
+        conn = sqlite3.connect(db_path.resolve().as_uri() + "?mode=ro", uri=True)
         try:
-            conn = sqlite3.connect(str(db_path))
-            has_table = conn.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name='sessions'"
-            ).fetchone()
-            if has_table:
-                count = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
-                needs_backfill = (count == 0)
-            else:
-                needs_backfill = True
+            return conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone() is None
+        finally:
             conn.close()
-        except Exception:
-            needs_backfill = True
+    except Exception:
+        return True
+
+
+def ensure_indexed(db_path: Path = None) -> bool:
+    """Auto-index on first use if database is empty or missing.
+
+    Returns True if backfill was triggered.
+    """
+    if db_path is None:
+        db_path = get_db_path()
+
+    needs_backfill = index_is_empty(db_path)
 
     if needs_backfill:
         print("\n  First run — indexing all your sessions...")
@@ -171,7 +191,7 @@ def ensure_indexed(db_path: Path = None) -> bool:
             except ImportError:
                 from indexer import SessionIndexer
         indexer = SessionIndexer(db_path=db_path)
-        indexer.connect()
+        indexer.connect(bulk_mode=True)
         indexer.backfill_all()
         indexer.close()
         return True
@@ -17,7 +17,9 @@ import json
 import os
 import sys
 import sqlite3
-import hashlib
+import time
+import zlib
+from functools import lru_cache, partial
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Optional
@@ -27,6 +29,51 @@ try:
 except ImportError:
     import config
 
+# Optional fast JSON decoder — takes bytes directly, several times quicker on
+# large JSONL files. orjson.JSONDecodeError subclasses json.JSONDecodeError,
+# so callers catch one type.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+
+def decode_jsonl_line(line: bytes):
+    """Decode one JSONL line; None if it isn't valid JSON. Shared with the analyzer."""
+    try:
+        return _json_loads(line)
+    except ValueError:
+        pass
+    # Invalid UTF-8 — drop the bad bytes, as text-mode reading would
+    try:
+        return _json_loads(line.decode('utf-8', errors='ignore'))
+    except ValueError:
+        return None
+
+
+_parse_iso = datetime.fromisoformat
+
+
+def _parse_ts(ts: str) -> datetime:
+    """Parse a session timestamp; Python 3.10's fromisoformat rejects a 'Z' suffix."""
+    if ts[-1:] == 'Z':
+        ts = ts[:-1] + '+00:00'
+    return _parse_iso(ts)
+
+
+def _first_client(text: str, clients_lower: tuple) -> Optional[str]:
+    """First configured client (config order) whose lowercased name is in text."""
+    for c, c_lower in clients_lower:
+        if c_lower in text:
+            return c
+    return None
+
+
+@lru_cache(maxsize=None)
+def _project_client(project_name: str, clients_lower: tuple) -> Optional[str]:
+    """Client named in a project name — the same for every session in the project."""
+    return _first_client(project_name.lower(), clients_lower)
+
 
 class SessionIndexer:
     def __init__(self, db_path: Path = None, projects_dir: Path = None):
@@ -34,18 +81,38 @@ class SessionIndexer:
         self.projects_dir = projects_dir or config.get_projects_dir()
         self.project_name_map = config.get_project_names()
         self.clients = config.get_clients()
+        # (client, lowercased) pairs — lowercased once, not per session
+        self._clients_lower = tuple((c, c.lower()) for c in self.clients)
         self.conn = None
-
-    def connect(self):
-        """Open DB connection and ensure schema exists."""
+        self._dirty_days = set()
+        # Bulk indexing writes in short batch transactions (see begin_batch)
+        self._in_batch = False
+        self._burst_start = 0.0
+        # Backfills stage FTS rows and index them in one pass (see _flush_fts_staging)
+        self._fts_staging = False
+        # This backfill's claim on the staging table (see _claim_backfill)
+        self._backfill_token = None
+
+    def connect(self, bulk_mode: bool = False):
+        """Open DB connection and ensure schema exists.
+
+        bulk_mode sizes the connection for a full backfill: a 200MB page
+        cache, in-memory temp B-trees and memory-mapped reads.
+        """
         self.conn = sqlite3.connect(str(self.db_path))
         self.conn.row_factory = sqlite3.Row
         self.conn.execute("PRAGMA journal_mode=WAL")
         self.conn.execute("PRAGMA synchronous=NORMAL")
+        if bulk_mode:
+            self.conn.execute("PRAGMA cache_size=-200000")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
+            self.conn.execute("PRAGMA mmap_size=268435456")
         self._create_schema()
 
     def close(self):
         if self.conn:
+            # Refresh planner statistics for any index that needs it (cheap no-op otherwise)
+            self.conn.execute("PRAGMA optimize")
             self.conn.close()
             self.conn = None
 
@@ -70,7 +137,9 @@ class SessionIndexer:
                 has_compaction INTEGER DEFAULT 0,
                 indexed_at TEXT NOT NULL,
                 last_modified TEXT,
-                file_hash TEXT
+                file_mtime_ns INTEGER,
+                last_byte_offset INTEGER,
+                parse_state TEXT
             );
 
             CREATE TABLE IF NOT EXISTS session_topics (
@@ -99,11 +168,42 @@ class SessionIndexer:
                 FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
             );
 
-            CREATE INDEX IF NOT EXISTS idx_sessions_project ON sessions(project);
-            CREATE INDEX IF NOT EXISTS idx_sessions_client ON sessions(client);
-            CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start_time);
-            CREATE INDEX IF NOT EXISTS idx_topics_session ON session_topics(session_id);
-            CREATE INDEX IF NOT EXISTS idx_topics_source ON session_topics(source);
+            -- Per-day rollups for analytics, refreshed by the indexer
+            CREATE TABLE IF NOT EXISTS rollup_daily (
+                day TEXT,
+                project TEXT,
+                project_name TEXT,
+                client TEXT,
+                sessions INTEGER NOT NULL,
+                total_minutes INTEGER,
+                timed_sessions INTEGER NOT NULL,
+                exchange_sum INTEGER,
+                exchange_sessions INTEGER NOT NULL,
+                compacted_sessions INTEGER NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS rollup_tool_daily (
+                day TEXT,
+                project TEXT,
+                project_name TEXT,
+                client TEXT,
+                tool_name TEXT NOT NULL,
+                uses INTEGER NOT NULL,
+                sessions INTEGER NOT NULL
+            );
+
+            -- At most one row: the backfill that owns session_content_staging
+            CREATE TABLE IF NOT EXISTS backfill_owner (
+                token TEXT NOT NULL,
+                heartbeat REAL NOT NULL
+            );
+
+            DROP INDEX IF EXISTS idx_sessions_start;
+            DROP INDEX IF EXISTS idx_topics_session;
+            -- Answers the topic de-duplication check on every upsert
+            CREATE INDEX IF NOT EXISTS idx_topics_session_topic ON session_topics(session_id, topic, source);
+            CREATE INDEX IF NOT EXISTS idx_rollup_day ON rollup_daily(day);
+            CREATE INDEX IF NOT EXISTS idx_rollup_tool_day ON rollup_tool_daily(day);
         """)
 
         # FTS5 table — check if exists first
@@ -119,37 +219,260 @@ class SessionIndexer:
                 )
             """)
 
+        # Columns added after the first release. Databases from before
+        # file_mtime_ns keep their legacy file_hash column; their rows simply
+        # re-index once
+        columns = {c['name'] for c in self.conn.execute("PRAGMA table_info(sessions)")}
+        for name, decl in (('file_mtime_ns', 'INTEGER'), ('last_byte_offset', 'INTEGER'),
+                           ('parse_state', 'TEXT')):
+            if name not in columns:
+                self.conn.execute(f"ALTER TABLE sessions ADD COLUMN {name} {decl}")
+
         self.conn.commit()
 
-    def _file_hash(self, path: Path) -> str:
-        """Quick hash based on size + mtime (not content — too slow for backfill)."""
-        stat = path.stat()
-        return hashlib.md5(f"{stat.st_size}:{stat.st_mtime}".encode()).hexdigest()
+        # Staged FTS rows and dropped read-side indexes: a running backfill's,
+        # or a killed one's to recover (or a new database's indexes to create)
+        names = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master")}
+        if ('session_content_staging' in names or not names.issuperset(self._SECONDARY_INDEXES)
+                or self.conn.execute("SELECT 1 FROM backfill_owner").fetchone()):
+            self._recover_backfill()
+
+        # Databases from before rollups existed: populate them once
+        if not self.conn.execute("SELECT 1 FROM rollup_daily LIMIT 1").fetchone():
+            if self.conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone():
+                self._rebuild_rollups()
+
+    # Read-side indexes nothing in the upsert path looks up, so a large
+    # backfill can drop them and rebuild each with one sort afterwards
+    _SECONDARY_INDEXES = {
+        'idx_sessions_project': "sessions(project)",
+        'idx_sessions_client': "sessions(client)",
+        # Covering indexes: analytics/rollup scans never touch the base rows
+        'idx_sessions_start_covering': """sessions(
+            start_time, client, project_name, project,
+            duration_minutes, exchange_count, has_compaction
+        )""",
+        'idx_tools_session_covering': "session_tools(session_id, tool_name, use_count)",
+        # Tool/agent-name lookups (find --tool/--agent, top tools) scan
+        # these instead of the tables
+        'idx_tools_name_covering': "session_tools(tool_name, session_id, use_count)",
+        'idx_agents_name': "session_agents(agent_name, session_id)",
+        'idx_topics_source': "session_topics(source)",
+    }
+
+    def _create_secondary_indexes(self):
+        """Create the read-side indexes (no-op for ones that exist)."""
+        for name, target in self._SECONDARY_INDEXES.items():
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+    def _drop_secondary_indexes(self):
+        """Drop the read-side indexes ahead of a bulk load."""
+        for name in self._SECONDARY_INDEXES:
+            self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    # Rollup rows are grouped by day + project + client so analytics can
+    # apply its period/client/project filters without touching `sessions`.
+    _ROLLUP_SESSIONS_SQL = """
+        INSERT INTO rollup_daily (
+            day, project, project_name, client, sessions, total_minutes,
+            timed_sessions, exchange_sum, exchange_sessions, compacted_sessions
+        )
+        SELECT date(s.start_time), s.project, s.project_name, s.client, COUNT(*),
+               SUM(s.duration_minutes), COUNT(s.duration_minutes),
+               SUM(s.exchange_count), COUNT(s.exchange_count),
+               SUM(CASE WHEN s.has_compaction = 1 THEN 1 ELSE 0 END)
+        FROM sessions s
+        {where}
+        GROUP BY 1, 2, 3, 4
+    """
+
+    _ROLLUP_TOOLS_SQL = """
+        INSERT INTO rollup_tool_daily (
+            day, project, project_name, client, tool_name, uses, sessions
+        )
+        SELECT date(s.start_time), s.project, s.project_name, s.client,
+               st.tool_name, SUM(st.use_count), COUNT(DISTINCT st.session_id)
+        FROM sessions s
+        CROSS JOIN session_tools st ON st.session_id = s.session_id
+        {where}
+        GROUP BY 1, 2, 3, 4, 5
+    """
+
+    def _rebuild_rollups(self):
+        """Recompute every analytics rollup row from scratch."""
+        self.conn.execute("DELETE FROM rollup_daily")
+        self.conn.execute("DELETE FROM rollup_tool_daily")
+        self.conn.execute(self._ROLLUP_SESSIONS_SQL.format(where=""))
+        self.conn.execute(self._ROLLUP_TOOLS_SQL.format(where=""))
+        self.conn.commit()
+        self._dirty_days.clear()
+
+    def _flush_rollups(self):
+        """Recompute rollup rows for days touched since the last flush."""
+        # A start_time range the start_time index can seek, widened by a day
+        # each way for UTC-offset timestamps; date() then keeps the exact day.
+        # Formatted once so every day reuses the same cached statements
+        dated = ("WHERE s.start_time >= date(:day, '-1 day') AND s.start_time < date(:day, '+2 days')"
+                 " AND date(s.start_time) = :day")
+        undated = "WHERE date(s.start_time) IS NULL"
+        statements = {
+            where: (self._ROLLUP_SESSIONS_SQL.format(where=where),
+                    self._ROLLUP_TOOLS_SQL.format(where=where))
+            for where in (dated, undated)
+        }
+        for day in self._dirty_days:
+            sessions_sql, tools_sql = statements[undated if day is None else dated]
+            self.conn.execute("DELETE FROM rollup_daily WHERE day IS ?", (day,))
+            self.conn.execute("DELETE FROM rollup_tool_daily WHERE day IS ?", (day,))
+            self.conn.execute(sessions_sql, {'day': day})
+            self.conn.execute(tools_sql, {'day': day})
+        self.conn.commit()
+        self._dirty_days.clear()
+
+    @staticmethod
+    def _file_hash(path: Path, stat_result: os.stat_result = None) -> tuple:
+        """Change key based on size + mtime (not content — too slow for backfill)."""
+        stat = stat_result or path.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def _indexed_file_keys(self) -> dict:
+        """Map session_id -> (file_size, file_mtime_ns) for every indexed session.
+
+        One query up front, so change checks are dict lookups instead of a
+        SELECT per file.
+        """
+        return {
+            row[0]: (row[1], row[2])
+            for row in self.conn.execute("SELECT session_id, file_size, file_mtime_ns FROM sessions")
+        }
+
+    def _parse_session(self, session_path: Path, stat_result: os.stat_result = None) -> Optional[dict]:
+        """Parse a session JSONL file into indexable data.
 
-    def _parse_session(self, session_path: Path) -> Optional[dict]:
-        """Parse a session JSONL file into indexable data."""
+        Pass the file's stat_result when the caller already has it.
+        """
+        return self._parse_session_file(
+            session_path, stat_result, project_name_map=self.project_name_map,
+            clients_lower=self._clients_lower,
+        )
+
+    def _parse_changed(self, session_path: Path, stat_result: os.stat_result = None) -> Optional[dict]:
+        """Parse a modified session, reading only the appended tail when possible.
+
+        Sessions grow by appending lines, so a file that is larger than its
+        last_byte_offset and still has the same bytes just before it resumes
+        from the saved parse_state. Anything else is parsed from scratch.
+        """
+        stat_result = stat_result or session_path.stat()
+        row = self.conn.execute(
+            "SELECT last_byte_offset, parse_state FROM sessions WHERE session_id=?",
+            (session_path.stem,),
+        ).fetchone()
+        resume = None
+        if row and row['parse_state'] and stat_result.st_size > row['last_byte_offset']:
+            offset, state = row['last_byte_offset'], json.loads(row['parse_state'])
+            if state['prompts'] >= self.RESUME_MIN_PROMPTS:
+                try:
+                    with open(session_path, 'rb') as f:
+                        f.seek(max(0, offset - self._RESUME_CHECK_BYTES))
+                        if zlib.crc32(f.read(offset - f.tell())) == state['tail_crc']:
+                            resume = (offset, state)
+                except OSError:
+                    pass
+        if not resume:
+            return self._parse_session(session_path, stat_result)
+
+        data = self._parse_session_file(
+            session_path, stat_result, project_name_map=self.project_name_map,
+            clients_lower=self._clients_lower, resume=resume,
+        )
+        if not data or state['fts_full'] or not data['fts_append']:
+            return data
+
+        # FTS content isn't full yet: extend the stored text with the new prompts
+        row = self.conn.execute(
+            "SELECT content FROM session_content WHERE session_id=?", (data['session_id'],)
+        ).fetchone()
+        if not row:
+            return self._parse_session(session_path, stat_result)
+        room = self.FTS_MAX_PROMPTS - state['prompts']
+        content = '\n'.join([row[0], *data['fts_append'][:room]])
+        data['parse_state']['fts_full'] = (
+            data['parse_state']['fts_full'] or len(content) >= self.FTS_MAX_CHARS
+        )
+        data['fts_content'] = content[:self.FTS_MAX_CHARS]
+        return data
+
+    # FTS content is the first FTS_MAX_PROMPTS user prompts, capped at FTS_MAX_CHARS
+    FTS_MAX_PROMPTS = 50
+    FTS_MAX_CHARS = 100000
+    # Appended sessions resume from their last indexed byte only once they
+    # have this many prompts — by then client detection and the prompt-based
+    # title (first 10 / first 5 prompts) can no longer change
+    RESUME_MIN_PROMPTS = 10
+    # Bytes before the resume offset that must be unchanged to trust it
+    _RESUME_CHECK_BYTES = 1024
+
+    @staticmethod
+    def _parse_session_file(session_path: Path, stat_result: Optional[os.stat_result],
+                            project_name_map: dict, clients_lower: tuple,
+                            resume: tuple = None) -> Optional[dict]:
+        """Parse one session file. Static so backfill worker processes can run it.
+
+        With resume=(offset, state) only the bytes after offset are read and
+        folded into the counters saved in state (the previous parse_state);
+        'fts_content' is then None and 'fts_append' holds the new prompts.
+        """
         session_id = session_path.stem
         project_dir = session_path.parent.name
 
         user_prompts = []
-        tools = {}
-        agents = {}
-        exchange_count = 0
-        start_time = None
-        end_time = None
-        model = None
-        has_compaction = False
-        title = None
-        title_display = None
-        tags_str = None
         summaries = []
+        if resume:
+            offset, state = resume
+            tools = state['tools']
+            agents = state['agents']
+            exchange_count = state['exchange_count']
+            start_time = state['start_time']
+            end_time = state['end_time']
+            model = state['model']
+            has_compaction = state['has_compaction']
+            title = state['title']
+            title_display = state['title_display']
+            tags_str = state['tags']
+        else:
+            offset, state = 0, None
+            tools = {}
+            agents = {}
+            exchange_count = 0
+            start_time = None
+            end_time = None
+            model = None
+            has_compaction = False
+            title = None
+            title_display = None
+            tags_str = None
+
+        # Only the prompts that can reach FTS (first FTS_MAX_PROMPTS, up to
+        # FTS_MAX_CHARS) are kept, plus the first RESUME_MIN_PROMPTS for
+        # client detection; collection stops once those are in hand
+        max_prompts, max_chars = SessionIndexer.FTS_MAX_PROMPTS, SessionIndexer.FTS_MAX_CHARS
+        if state:
+            prompt_limit = 0 if state['fts_full'] else max_prompts - state['prompts']
+            prompt_keep = 0
+        else:
+            prompt_limit = max_prompts
+            prompt_keep = SessionIndexer.RESUME_MIN_PROMPTS
+        prompt_chars = 0
+        collecting = prompt_limit > 0
 
         try:
-            with open(session_path, 'r', encoding='utf-8', errors='ignore') as f:
+            with open(session_path, 'rb') as f:
+                f.seek(offset)
+                line, entry = b'', None
                 for line in f:
-                    try:
-                        entry = json.loads(line)
-                    except json.JSONDecodeError:
+                    entry = decode_jsonl_line(line)
+                    if entry is None:
                         continue
 
                     entry_type = entry.get('type')
@@ -161,28 +484,59 @@ class SessionIndexer:
                             start_time = timestamp
                         end_time = timestamp
 
-                    # Custom title (latest wins)
-                    if entry_type == 'custom-title':
-                        title_display = entry.get('customTitle', '')
-                        # Parse ">>> NAME ... [tags]" format
-                        if title_display.startswith('>>>'):
-                            parts = title_display.split('......')
-                            name_part = parts[0].replace('>>>', '').strip()
-                            title = name_part
-                            if len(parts) > 1:
-                                tag_part = parts[-1].strip().strip('[]<>').strip()
-                                if tag_part:
-                                    tags_str = tag_part
+                    # One branch per entry type, most frequent first
+                    if entry_type == 'assistant':
+                        exchange_count += 1
+                        message = entry.get('message', {})
+                        if not model:
+                            model = message.get('model', '')
+
+                        # Extract tool usage
+                        msg_content = message.get('content', [])
+                        if isinstance(msg_content, list):
+                            for item in msg_content:
+                                if isinstance(item, dict) and item.get('type') == 'tool_use':
+                                    tool = item.get('name', '')
+                                    tools[tool] = tools.get(tool, 0) + 1
+
+                                    # Track Task invocations as agents
+                                    if tool == 'Task':
+                                        agent_type = item.get('input', {}).get('subagent_type', '')
+                                        if agent_type:
+                                            agents[agent_type] = agents.get(agent_type, 0) + 1
+
+                    elif entry_type == 'user':
+                        exchange_count += 1
+
+                        # Extract user messages
+                        if collecting:
+                            content = entry.get('message', {}).get('content', '')
+                            if isinstance(content, list):
+                                text_parts = [
+                                    item.get('text', '')
+                                    for item in content
+                                    if isinstance(item, dict) and item.get('type') == 'text'
+                                ]
+                                content = ' '.join(text_parts)
+                            if content and len(content) > 10:
+                                user_prompts.append(content)
+                                prompt_chars += len(content)
+                                if len(user_prompts) >= prompt_limit or (
+                                    prompt_chars >= max_chars and len(user_prompts) >= prompt_keep
+                                ):
+                                    collecting = False
 
                     # Compaction summaries
-                    if entry_type == 'summary':
+                    elif entry_type == 'summary':
                         has_compaction = True
                         summary_text = entry.get('summary', '')
                         if summary_text:
-                            # Parse JSON summaries to extract clean title/text
-                            if summary_text.strip().startswith('{'):
+                            # Parse JSON summaries to extract clean title/text —
+                            # only worth decoding if one of those keys is there
+                            if (summary_text.lstrip()[:1] == '{'
+                                    and ('"title"' in summary_text or '"summary"' in summary_text)):
                                 try:
-                                    parsed = json.loads(summary_text)
+                                    parsed = _json_loads(summary_text)
                                     clean = parsed.get('title', '') or parsed.get('summary', '') or summary_text
                                     summaries.append(clean)
                                 except (json.JSONDecodeError, AttributeError):
@@ -190,88 +544,82 @@ class SessionIndexer:
                             else:
                                 summaries.append(summary_text)
 
-                    # Count exchanges
-                    if entry_type in ('user', 'assistant'):
-                        exchange_count += 1
-
-                    # Extract model
-                    if entry_type == 'assistant' and not model:
-                        model = entry.get('message', {}).get('model', '')
-
-                    # Extract user messages
-                    if entry_type == 'user':
-                        content = entry.get('message', {}).get('content', '')
-                        if isinstance(content, list):
-                            text_parts = [
-                                item.get('text', '')
-                                for item in content
-                                if isinstance(item, dict) and item.get('type') == 'text'
-                            ]
-                            content = ' '.join(text_parts)
-                        if content and len(content) > 10:
-                            user_prompts.append(content)
-
-                    # Extract tool usage
-                    if entry_type == 'assistant':
-                        msg_content = entry.get('message', {}).get('content', [])
-                        if isinstance(msg_content, list):
-                            for item in msg_content:
-                                if isinstance(item, dict) and item.get('type') == 'tool_use':
-                                    tool = item.get('name', '')
-                                    tools[tool] = tools.get(tool, 0) + 1
+                    # Custom title (latest wins)
+                    elif entry_type == 'custom-title':
+                        title_display = entry.get('customTitle', '')
+                        # Parse ">>> NAME ... [tags]" format
+                        if title_display.startswith('>>>'):
+                            parts = title_display.split('......')
+                            name_part = parts[0].replace('>>>', '').strip()
+                            title = name_part
+                            if len(parts) > 1:
+                                tag_part = parts[-1].strip().strip('[]<>').strip()
+                                if tag_part:
+                                    tags_str = tag_part
 
-                                    # Track Task invocations as agents
-                                    if tool == 'Task':
-                                        agent_type = item.get('input', {}).get('subagent_type', '')
-                                        if agent_type:
-                                            agents[agent_type] = agents.get(agent_type, 0) + 1
+                # Where the next resume starts: a trailing line that is not
+                # valid JSON yet is probably still being written
+                end_offset = f.tell()
+                if entry is None and not line.endswith(b'\n'):
+                    end_offset -= len(line)
+                f.seek(max(0, end_offset - SessionIndexer._RESUME_CHECK_BYTES))
+                tail_crc = zlib.crc32(f.read(end_offset - f.tell()))
 
         except Exception as e:
             print(f"Error parsing {session_id}: {e}", file=sys.stderr)
             return None
 
+        # Saved before auto-titling so a resume can tell explicit titles apart
+        explicit = (title, title_display, tags_str)
+        first_summary = state['first_summary'] if state else None
+        if first_summary is None and summaries:
+            first_summary = summaries[0][:81]  # enough to know if it needs '...'
+        prompt_title = state['prompt_title'] if state else None
+
         # Auto-generate title if none was set explicitly
-        if not title_display and summaries:
-            title_display = summaries[0][:80]
-            if len(summaries[0]) > 80:
-                title_display = summaries[0][:77] + '...'
+        if not title_display and first_summary:
+            title_display = first_summary[:80]
+            if len(first_summary) > 80:
+                title_display = first_summary[:77] + '...'
             title = title_display
-        elif not title_display and user_prompts:
+        elif not title_display and (user_prompts or prompt_title):
             # Use first substantial user message, skipping bad title candidates
-            title_display = self._pick_title_from_prompts(user_prompts)
+            if not state:
+                prompt_title = SessionIndexer._pick_title_from_prompts(user_prompts)
+            title_display = prompt_title
             if title_display:
                 title = title_display
 
         # Detect client from user prompts + file paths in tool calls
-        client = None
-        if self.clients:
+        client = state['client'] if state else None
+        if clients_lower and not state:
             all_text = ' '.join(user_prompts[:10]).lower()
-            for c in self.clients:
-                if c.lower() in all_text:
-                    client = c
-                    break
             # Also check project name
-            if not client:
-                project_name = self.project_name_map.get(project_dir, project_dir)
-                for c in self.clients:
-                    if c.lower() in project_name.lower():
-                        client = c
-                        break
+            client = (_first_client(all_text, clients_lower)
+                      or _project_client(project_name_map.get(project_dir, project_dir), clients_lower))
 
         # Calculate duration
         duration = None
         if start_time and end_time:
             try:
-                s = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                e = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
+                s = _parse_ts(start_time)
+                e = _parse_ts(end_time)
                 duration = int((e - s).total_seconds() / 60)
             except:
                 pass
 
-        # Build FTS content from user prompts (truncated to avoid huge entries)
-        fts_content = '\n'.join(user_prompts[:50])
-        if len(fts_content) > 100000:
-            fts_content = fts_content[:100000]
+        # Build FTS content from user prompts (truncated to avoid huge entries).
+        # A resume leaves it to the caller, which holds the stored content.
+        if state:
+            prompt_count = state['prompts'] + len(user_prompts)
+            fts_full = state['fts_full'] or prompt_count >= max_prompts
+            fts_content = None
+        else:
+            prompt_count = len(user_prompts)
+            fts_content = '\n'.join(user_prompts[:max_prompts])
+            fts_full = prompt_count >= max_prompts or len(fts_content) >= max_chars
+            if len(fts_content) > max_chars:
+                fts_content = fts_content[:max_chars]
 
         # Add summaries as bonus topic data
         topic_entries = []
@@ -283,27 +631,40 @@ class SessionIndexer:
                 'exchange_number': None,
             })
 
+        file_size, file_mtime_ns = SessionIndexer._file_hash(session_path, stat_result)
+
         return {
             'session_id': session_id,
             'project': project_dir,
-            'project_name': self.project_name_map.get(project_dir, project_dir),
+            'project_name': project_name_map.get(project_dir, project_dir),
             'title': title,
             'title_display': title_display,
             'tags': tags_str,
             'client': client,
             'file_path': str(session_path),
-            'file_size': session_path.stat().st_size,
+            'file_size': file_size,
             'exchange_count': exchange_count,
             'start_time': start_time,
             'end_time': end_time,
             'duration_minutes': duration,
             'model': model,
             'has_compaction': 1 if has_compaction else 0,
-            'file_hash': self._file_hash(session_path),
+            'file_mtime_ns': file_mtime_ns,
             'tools': tools,
             'agents': agents,
             'fts_content': fts_content,
+            'fts_append': user_prompts if state else None,
             'topics': topic_entries,
+            'last_byte_offset': end_offset,
+            'parse_state': {
+                'tools': tools, 'agents': agents, 'exchange_count': exchange_count,
+                'start_time': start_time, 'end_time': end_time, 'model': model,
+                'has_compaction': has_compaction, 'title': explicit[0],
+                'title_display': explicit[1], 'tags': explicit[2],
+                'first_summary': first_summary, 'prompt_title': prompt_title,
+                'client': client, 'prompts': prompt_count, 'fts_full': fts_full,
+                'tail_crc': tail_crc,
+            },
         }
 
     # First-line patterns that make bad auto-titles
@@ -314,13 +675,14 @@ class SessionIndexer:
         'Explore the',  # Agent exploration prompts
     )
 
-    def _pick_title_from_prompts(self, user_prompts: list) -> Optional[str]:
+    @classmethod
+    def _pick_title_from_prompts(cls, user_prompts: list) -> Optional[str]:
         """Pick the best user message to use as auto-title, skipping system noise."""
         for prompt in user_prompts[:5]:
             first_line = prompt.strip().split('\n')[0].strip()
             if len(first_line) <= 10:
                 continue
-            if any(first_line.startswith(p) for p in self._SKIP_TITLE_PREFIXES):
+            if first_line.startswith(cls._SKIP_TITLE_PREFIXES):
                 continue
             if len(first_line) > 80:
                 return first_line[:77] + '...'
@@ -341,171 +703,415 @@ class SessionIndexer:
             print(f"Session file not found: {session_id or file_path}", file=sys.stderr)
             return False
 
-        data = self._parse_session(path)
+        data = self._parse_changed(path)
         if not data:
             return False
 
-        return self._upsert_session(data)
+        ok = self._upsert_session(data)
+        self._flush_rollups()
+        return ok
 
     def _find_session_file(self, session_id: str) -> Optional[Path]:
         """Find session file by ID across all project directories."""
-        for project_dir in self.projects_dir.iterdir():
-            if not project_dir.is_dir():
-                continue
-            candidate = project_dir / f"{session_id}.jsonl"
-            if candidate.exists():
-                return candidate
+        name = f"{session_id}.jsonl"
+        with os.scandir(self.projects_dir) as projects:
+            for project in projects:
+                if not project.is_dir():
+                    continue
+                candidate = os.path.join(project.path, name)
+                if os.path.exists(candidate):
+                    return Path(candidate)
         return None
 
+    def _iter_session_files(self):
+        """Yield (session_id, path, stat) for every session JSONL file.
+
+        One scandir pass: directory entries carry their type, so there is no
+        Path/glob overhead and no extra stat just to tell files from dirs.
+        """
+        with os.scandir(self.projects_dir) as projects:
+            for project in projects:
+                if not project.is_dir():
+                    continue
+                with os.scandir(project.path) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        # Same files glob("*.jsonl") matched: no hidden files
+                        if name.endswith('.jsonl') and not name.startswith('.'):
+                            yield name[:-6], entry.path, entry.stat()
+
+    # Bulk runs parse with no transaction open and write what they parsed
+    # in bursts of at most this many sessions / this much parse time, so
+    # hook writes get the lock in between
+    BATCH_COMMIT_EVERY = 500
+    BURST_SECONDS = 0.2
+    # Backfills with fewer files to parse than this stay in-process;
+    # below it the worker start-up costs more than it saves
+    PARALLEL_PARSE_MIN = 64
+
+    def begin_batch(self):
+        """Start a bulk-indexing transaction.
+
+        Upserts inside a batch share one commit (one fsync) instead of one
+        each; a failed session is rolled back to its own savepoint without
+        losing the others. IMMEDIATE takes the write lock for the whole
+        batch, so hooks can't write until end_batch — keep batches to
+        short bursts of already-parsed sessions (see _queue_upsert).
+        """
+        if self.conn.in_transaction:
+            self.conn.commit()
+        self.conn.execute("BEGIN IMMEDIATE")
+        self._in_batch = True
+
+    def end_batch(self):
+        """Commit and leave the bulk-indexing transaction."""
+        self.conn.commit()
+        self._in_batch = False
+
+    def _flush_fts_staging(self):
+        """Move staged FTS rows into session_content in one pass.
+
+        Replacing rows one session at a time costs a full scan of the FTS
+        table per DELETE (session_id isn't indexed) plus a segment write per
+        INSERT. Here it is one scan, one bulk insert and one segment merge.
+        """
+        self.conn.execute("""
+            DELETE FROM session_content
+            WHERE session_id IN (SELECT session_id FROM session_content_staging)
+        """)
+        self.conn.execute("""
+            INSERT INTO session_content (session_id, content)
+            SELECT session_id, content FROM session_content_staging
+            WHERE content != '' ORDER BY rowid
+        """)
+        self.conn.execute("DROP TABLE session_content_staging")
+        self.conn.execute("INSERT INTO session_content (session_content) VALUES ('optimize')")
+
+    # A backfill refreshes its backfill_owner heartbeat with every burst; a
+    # claim left this long without one belongs to a backfill that was killed
+    BACKFILL_STALE_SECONDS = 600
+
+    def _backfill_active(self) -> bool:
+        """True while a live backfill owns session_content_staging."""
+        row = self.conn.execute("SELECT heartbeat FROM backfill_owner").fetchone()
+        return row is not None and time.time() - row[0] < self.BACKFILL_STALE_SECONDS
+
+    def _claim_backfill(self, drop_indexes: bool) -> bool:
+        """Take ownership of session_content_staging for this backfill.
+
+        drop_indexes also drops the read-side indexes, which only the owner
+        rebuilds (in _release_backfill). Returns False when another live
+        backfill owns them; this one then writes FTS rows directly and
+        leaves the indexes alone. A stale claim is taken over along with
+        whatever its backfill staged or dropped.
+        """
+        token = os.urandom(8).hex()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self._backfill_active():
+                return False
+            self.conn.execute("DELETE FROM backfill_owner")
+            self.conn.execute(
+                "INSERT INTO backfill_owner (token, heartbeat) VALUES (?, ?)", (token, time.time())
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_content_staging (session_id TEXT, content TEXT)"
+            )
+            if drop_indexes:
+                self._drop_secondary_indexes()
+        self._backfill_token = token
+        return True
+
+    def _touch_backfill(self) -> bool:
+        """Refresh this backfill's heartbeat; False once its claim was recovered as stale."""
+        return self.conn.execute(
+            "UPDATE backfill_owner SET heartbeat=? WHERE token=?", (time.time(), self._backfill_token)
+        ).rowcount == 1
+
+    def _release_backfill(self):
+        """Index staged FTS rows, rebuild dropped indexes and give up the claim."""
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self._touch_backfill():
+                self._flush_fts_staging()
+                self._create_secondary_indexes()
+                self.conn.execute("DELETE FROM backfill_owner")
+        self._backfill_token = None
+
+    def _recover_backfill(self):
+        """Finish what a killed backfill left: staged FTS rows and dropped indexes.
+
+        Leaves everything alone while the owning backfill is still running:
+        it keeps inserting into the staging table until it releases it, and
+        rebuilding its indexes mid-run would undo the bulk load.
+        """
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self._backfill_active():
+                return
+            if self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='session_content_staging'"
+            ).fetchone():
+                self._flush_fts_staging()
+            self._create_secondary_indexes()
+            self.conn.execute("DELETE FROM backfill_owner")
+
+    # Statement text shared by every upsert (sqlite3 caches the prepared form)
+    _UPSERT_SESSION_SQL = """
+        INSERT INTO sessions (
+            session_id, project, project_name, title, title_display, tags,
+            client, file_path, file_size, exchange_count, start_time, end_time,
+            duration_minutes, model, has_compaction, indexed_at, last_modified, file_mtime_ns,
+            last_byte_offset, parse_state
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(session_id) DO UPDATE SET
+            title=excluded.title, title_display=excluded.title_display,
+            tags=excluded.tags, client=excluded.client,
+            file_size=excluded.file_size, exchange_count=excluded.exchange_count,
+            end_time=excluded.end_time, duration_minutes=excluded.duration_minutes,
+            model=excluded.model, has_compaction=excluded.has_compaction,
+            indexed_at=excluded.indexed_at, last_modified=excluded.last_modified,
+            file_mtime_ns=excluded.file_mtime_ns,
+            last_byte_offset=excluded.last_byte_offset, parse_state=excluded.parse_state
+    """
+
+    # session_id is a full-text column, so a MATCH on it finds the session's
+    # row through the FTS index instead of scanning every row; the equality
+    # re-checks the phrase hit
+    _DELETE_FTS_SQL = """
+        DELETE FROM session_content WHERE rowid IN (
+            SELECT rowid FROM session_content
+            WHERE session_content MATCH ? AND session_id = ?
+        )
+    """
+
+    # The existence check is part of the INSERT, answered from the
+    # (session_id, topic, source) index. No UNIQUE constraint: hooks
+    # may legitimately record the same topic more than once.
+    _INSERT_TOPIC_SQL = """
+        INSERT INTO session_topics (session_id, topic, captured_at, exchange_number, source)
+        SELECT ?1, ?2, ?3, ?4, ?5
+        WHERE NOT EXISTS (
+            SELECT 1 FROM session_topics WHERE session_id=?1 AND topic=?2 AND source=?5
+        )
+    """
+
     def _upsert_session(self, data: dict) -> bool:
         """Insert or update a session in the DB."""
+        if self._in_batch:
+            self.conn.execute("SAVEPOINT upsert")
         try:
             now = datetime.now().isoformat()
 
-            self.conn.execute("""
-                INSERT INTO sessions (
-                    session_id, project, project_name, title, title_display, tags,
-                    client, file_path, file_size, exchange_count, start_time, end_time,
-                    duration_minutes, model, has_compaction, indexed_at, last_modified, file_hash
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(session_id) DO UPDATE SET
-                    title=excluded.title, title_display=excluded.title_display,
-                    tags=excluded.tags, client=excluded.client,
-                    file_size=excluded.file_size, exchange_count=excluded.exchange_count,
-                    end_time=excluded.end_time, duration_minutes=excluded.duration_minutes,
-                    model=excluded.model, has_compaction=excluded.has_compaction,
-                    indexed_at=excluded.indexed_at, last_modified=excluded.last_modified,
-                    file_hash=excluded.file_hash
-            """, (
+            self.conn.execute(self._UPSERT_SESSION_SQL, (
                 data['session_id'], data['project'], data['project_name'],
                 data['title'], data['title_display'], data['tags'],
                 data['client'], data['file_path'], data['file_size'],
                 data['exchange_count'], data['start_time'], data['end_time'],
                 data['duration_minutes'], data['model'], data['has_compaction'],
-                now, now, data['file_hash'],
+                now, now, data['file_mtime_ns'],
+                data['last_byte_offset'], json.dumps(data['parse_state']),
             ))
 
-            # Upsert tools
-            self.conn.execute("DELETE FROM session_tools WHERE session_id=?", (data['session_id'],))
-            for tool, count in data['tools'].items():
-                self.conn.execute(
-                    "INSERT INTO session_tools (session_id, tool_name, use_count) VALUES (?, ?, ?)",
-                    (data['session_id'], tool, count)
-                )
+            sid = data['session_id']
 
-            # Upsert agents
-            self.conn.execute("DELETE FROM session_agents WHERE session_id=?", (data['session_id'],))
-            for agent, count in data['agents'].items():
-                self.conn.execute(
-                    "INSERT INTO session_agents (session_id, agent_name, invocation_count) VALUES (?, ?, ?)",
-                    (data['session_id'], agent, count)
-                )
+            # Upsert tools and agents
+            self._replace_counts('session_tools', 'tool_name', 'use_count', sid, data['tools'])
+            self._replace_counts('session_agents', 'agent_name', 'invocation_count', sid, data['agents'])
 
-            # Upsert FTS content
-            self.conn.execute("DELETE FROM session_content WHERE session_id=?", (data['session_id'],))
-            if data['fts_content']:
+            # Upsert FTS content (None: a resumed parse left it unchanged)
+            if data['fts_content'] is not None and self._fts_staging:
                 self.conn.execute(
-                    "INSERT INTO session_content (session_id, content) VALUES (?, ?)",
-                    (data['session_id'], data['fts_content'])
+                    "INSERT INTO session_content_staging (session_id, content) VALUES (?, ?)",
+                    (sid, data['fts_content'])
                 )
-
-            # Add topics from compaction summaries (don't delete existing hook-captured topics)
-            for topic in data['topics']:
-                # Check if this exact topic already exists
-                existing = self.conn.execute(
-                    "SELECT id FROM session_topics WHERE session_id=? AND topic=? AND source=?",
-                    (data['session_id'], topic['topic'], topic['source'])
-                ).fetchone()
-                if not existing:
+            elif data['fts_content'] is not None:
+                if any(ch.isalnum() for ch in sid):
+                    phrase = sid.replace('"', '""')
+                    self.conn.execute(self._DELETE_FTS_SQL, (f'session_id : "{phrase}"', sid))
+                else:
+                    # No tokens to match on — fall back to the scan
+                    self.conn.execute("DELETE FROM session_content WHERE session_id=?", (sid,))
+                if data['fts_content']:
                     self.conn.execute(
-                        "INSERT INTO session_topics (session_id, topic, captured_at, exchange_number, source) VALUES (?, ?, ?, ?, ?)",
-                        (data['session_id'], topic['topic'], topic['captured_at'],
-                         topic['exchange_number'], topic['source'])
+                        "INSERT INTO session_content (session_id, content) VALUES (?, ?)",
+                        (sid, data['fts_content'])
                     )
 
-            self.conn.commit()
+            # Add topics from compaction summaries (don't delete existing hook-captured topics)
+            self.conn.executemany(self._INSERT_TOPIC_SQL, [
+                (sid, topic['topic'], topic['captured_at'], topic['exchange_number'], topic['source'])
+                for topic in data['topics']
+            ])
+
+            self._dirty_days.add(self._session_day(data['session_id']))
+            if self._in_batch:
+                self.conn.execute("RELEASE upsert")
+            else:
+                self.conn.commit()
             return True
 
         except Exception as e:
             print(f"Error upserting {data['session_id']}: {e}", file=sys.stderr)
-            self.conn.rollback()
+            if self._in_batch:
+                self.conn.execute("ROLLBACK TO upsert")
+                self.conn.execute("RELEASE upsert")
+            else:
+                self.conn.rollback()
             return False
 
+    def _replace_counts(self, table: str, key: str, count: str, sid: str, counts: dict):
+        """Make a session's per-name count rows in table match counts.
+
+        Upserts only touch rows whose count changed, and the DELETE only
+        removes names that are gone — re-indexing a session rewrites
+        nothing that is still current.
+        """
+        self.conn.executemany(f"""
+            INSERT INTO {table} (session_id, {key}, {count}) VALUES (?, ?, ?)
+            ON CONFLICT(session_id, {key}) DO UPDATE SET {count}=excluded.{count}
+            WHERE {count} IS NOT excluded.{count}
+        """, [(sid, name, n) for name, n in counts.items()])
+        placeholders = ','.join('?' * len(counts))
+        self.conn.execute(
+            f"DELETE FROM {table} WHERE session_id=? AND {key} NOT IN ({placeholders})",
+            (sid, *counts),
+        )
+
+    def _session_day(self, session_id: str) -> Optional[str]:
+        """Rollup day of a stored session (start_time is never updated on re-index)."""
+        return self.conn.execute(
+            "SELECT date(start_time) FROM sessions WHERE session_id=?", (session_id,)
+        ).fetchone()[0]
+
     def backfill_all(self, progress_interval: int = 100) -> dict:
         """Index all existing sessions. Returns stats dict."""
         stats = {'total': 0, 'indexed': 0, 'skipped': 0, 'errors': 0}
-        session_files = []
-
-        for project_dir in self.projects_dir.iterdir():
-            if not project_dir.is_dir():
-                continue
-            for f in project_dir.glob("*.jsonl"):
-                session_files.append(f)
+        session_files = list(self._iter_session_files())
 
         stats['total'] = len(session_files)
         print(f"Found {stats['total']} session files to index")
 
-        for i, session_path in enumerate(session_files):
-            if (i + 1) % progress_interval == 0:
-                print(f"  Progress: {i + 1}/{stats['total']} ({stats['indexed']} indexed, {stats['errors']} errors)")
-
-            # Skip if already indexed with same hash
-            session_id = session_path.stem
-            current_hash = self._file_hash(session_path)
-            existing = self.conn.execute(
-                "SELECT file_hash FROM sessions WHERE session_id=?", (session_id,)
-            ).fetchone()
-            if existing and existing['file_hash'] == current_hash:
-                stats['skipped'] += 1
-                continue
+        # Skip files already indexed with the same size + mtime
+        indexed = self._indexed_file_keys()
+        to_parse = [
+            (Path(path), st) for session_id, path, st in session_files
+            if indexed.get(session_id) != (st.st_size, st.st_mtime_ns)
+        ]
+        stats['skipped'] = stats['total'] - len(to_parse)
+        # Rebuilding indexes only pays off when a good share of rows changes
+        rebuild_indexes = len(to_parse) > len(indexed) // 10
+
+        # Parsing is CPU-bound and independent per file, so large backfills
+        # fan it out to worker processes; the DB writes stay in this one
+        pool = None
+        workers = os.cpu_count() or 1
+        if len(to_parse) >= self.PARALLEL_PARSE_MIN and workers > 1:
+            # Imported here: it pulls in multiprocessing, which the hook and
+            # incremental paths never need
+            from concurrent.futures import ProcessPoolExecutor
+            try:
+                pool = ProcessPoolExecutor(max_workers=workers)
+            except (OSError, NotImplementedError):
+                pool = None  # no multiprocessing support here — parse serially
+        if pool:
+            parse = partial(self._parse_session_file, project_name_map=self.project_name_map,
+                            clients_lower=self._clients_lower)
+            parsed = pool.map(parse, *zip(*to_parse), chunksize=16)
+        else:
+            parsed = (self._parse_session(path, st) for path, st in to_parse)
 
-            data = self._parse_session(session_path)
-            if not data:
-                stats['errors'] += 1
-                continue
+        # No fsync during the backfill — the index can always be rebuilt
+        # from the JSONL files if the machine dies mid-run
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self._fts_staging = self._claim_backfill(drop_indexes=rebuild_indexes)
+        pending = []
+        try:
+            for i, data in enumerate(parsed, stats['skipped'] + 1):
+                if i % progress_interval == 0:
+                    print(f"  Progress: {i}/{stats['total']} ({stats['indexed']} indexed, {stats['errors']} errors)")
 
-            if self._upsert_session(data):
-                stats['indexed'] += 1
-            else:
-                stats['errors'] += 1
+                if not data:
+                    stats['errors'] += 1
+                    continue
+
+                self._queue_upsert(pending, data, stats)
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+            if pending:
+                self._upsert_burst(pending, stats)
+            if self._fts_staging:
+                self._fts_staging = False
+                self._release_backfill()
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        if stats['indexed']:
+            self._rebuild_rollups()
+            self.conn.execute("PRAGMA optimize")
 
         print(f"\nBackfill complete: {stats['indexed']} indexed, {stats['skipped']} unchanged, {stats['errors']} errors")
         return stats
 
+    def _upsert_burst(self, pending: list, stats: dict):
+        """Upsert parsed sessions in one batch transaction, then clear pending."""
+        self.begin_batch()
+        try:
+            if self._fts_staging and not self._touch_backfill():
+                # Claim recovered as stale (and staged rows indexed) by another
+                # process: write FTS rows directly from here on
+                self._fts_staging = False
+            for data in pending:
+                if self._upsert_session(data):
+                    stats['indexed'] += 1
+                else:
+                    stats['errors'] += 1
+        finally:
+            self.end_batch()
+        pending.clear()
+
+    def _queue_upsert(self, pending: list, data: dict, stats: dict):
+        """Queue a parsed session, writing the queue as a burst once it's due."""
+        if not pending:
+            self._burst_start = time.monotonic()
+        pending.append(data)
+        if (len(pending) >= self.BATCH_COMMIT_EVERY
+                or time.monotonic() - self._burst_start >= self.BURST_SECONDS):
+            self._upsert_burst(pending, stats)
+
     def index_incremental(self) -> dict:
         """Index new or modified sessions since last run."""
         stats = {'checked': 0, 'indexed': 0, 'unchanged': 0, 'errors': 0}
+        indexed = self._indexed_file_keys()
 
-        for project_dir in self.projects_dir.iterdir():
-            if not project_dir.is_dir():
-                continue
-            for session_path in project_dir.glob("*.jsonl"):
+        pending = []
+        try:
+            for session_id, path, st in self._iter_session_files():
                 stats['checked'] += 1
-                session_id = session_path.stem
-                current_hash = self._file_hash(session_path)
-
-                existing = self.conn.execute(
-                    "SELECT file_hash FROM sessions WHERE session_id=?", (session_id,)
-                ).fetchone()
-
-                if existing and existing['file_hash'] == current_hash:
+                if indexed.get(session_id) == (st.st_size, st.st_mtime_ns):
                     stats['unchanged'] += 1
                     continue
 
-                data = self._parse_session(session_path)
+                data = self._parse_changed(Path(path), st)
                 if not data:
                     stats['errors'] += 1
                     continue
 
-                if self._upsert_session(data):
-                    stats['indexed'] += 1
-                else:
-                    stats['errors'] += 1
+                self._queue_upsert(pending, data, stats)
+        finally:
+            if pending:
+                self._upsert_burst(pending, stats)
 
+        self._flush_rollups()
         return stats
 
-    def get_stats(self) -> dict:
-        """Get database statistics."""
+    def get_stats(self, top_n: Optional[int] = None) -> dict:
+        """Get database statistics.
+
+        `top_n` caps the per-project, per-client and top-tool breakdowns
+        (all rows when None; top tools default to 10).
+        """
+        limit = f" LIMIT {int(top_n)}" if top_n is not None else ""
         stats = {}
         stats['total_sessions'] = self.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
         stats['total_topics'] = self.conn.execute("SELECT COUNT(*) FROM session_topics").fetchone()[0]
@@ -514,19 +1120,20 @@ class SessionIndexer:
 
         # Sessions by project
         rows = self.conn.execute(
-            "SELECT project_name, COUNT(*) as cnt FROM sessions GROUP BY project_name ORDER BY cnt DESC"
+            "SELECT project_name, COUNT(*) as cnt FROM sessions GROUP BY project_name ORDER BY cnt DESC" + limit
         ).fetchall()
         stats['by_project'] = {r['project_name']: r['cnt'] for r in rows}
 
         # Sessions by client
         rows = self.conn.execute(
-            "SELECT client, COUNT(*) as cnt FROM sessions WHERE client IS NOT NULL GROUP BY client ORDER BY cnt DESC"
+            "SELECT client, COUNT(*) as cnt FROM sessions WHERE client IS NOT NULL GROUP BY client ORDER BY cnt DESC" + limit
         ).fetchall()
         stats['by_client'] = {r['client']: r['cnt'] for r in rows}
 
         # Top tools
         rows = self.conn.execute(
-            "SELECT tool_name, SUM(use_count) as total FROM session_tools GROUP BY tool_name ORDER BY total DESC LIMIT 10"
+            "SELECT tool_name, SUM(use_count) as total FROM session_tools GROUP BY tool_name ORDER BY total DESC"
+            + (limit or " LIMIT 10")
         ).fetchall()
         stats['top_tools'] = {r['tool_name']: r['total'] for r in rows}
 
@@ -570,7 +1177,7 @@ def main():
     projects_dir = config.get_projects_dir(override=args.projects_dir) if args.projects_dir else None
 
     indexer = SessionIndexer(db_path=db_path, projects_dir=projects_dir)
-    indexer.connect()
+    indexer.connect(bulk_mode=args.backfill)
 
     try:
         if args.backfill:
@@ -18,6 +18,7 @@ import sys
 import sqlite3
 from pathlib import Path
 from datetime import datetime, timedelta
+from typing import Optional
 
 try:
     from . import config
@@ -71,33 +72,98 @@ class SessionSearch:
         self.conn = None
 
     def connect(self):
-        self.conn = sqlite3.connect(str(self.db_path))
+        # Read-only use: autocommit (no implicit BEGIN bookkeeping), plus the
+        # same cache/mmap tuning as the analyzer's read-only connections
+        self.conn = sqlite3.connect(str(self.db_path), isolation_level=None)
         self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA query_only=1")
+        self.conn.execute("PRAGMA cache_size=-65536")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
 
     def close(self):
         if self.conn:
             self.conn.close()
 
+    def resolve_session_id(self, sid: str) -> Optional[str]:
+        """Expand a full or prefix session ID, or None if nothing matches.
+
+        Prefixes are looked up as a primary-key range scan rather than a
+        LIKE, which SQLite can only index under specific collation settings.
+        """
+        if len(sid) >= 36:
+            return sid
+        prefix = sid.lower()
+        rows = self.conn.execute(
+            "SELECT session_id FROM sessions WHERE session_id >= ? AND session_id < ? "
+            "ORDER BY session_id LIMIT 2",
+            (prefix, prefix + "\uffff"),
+        ).fetchall()
+        if not rows:
+            return None
+        if len(rows) > 1:
+            print(f"Ambiguous session ID prefix '{sid}' — using {rows[0]['session_id']}",
+                  file=sys.stderr)
+        return rows[0]["session_id"]
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # A result row's first 10 topics as one JSON array, so search/find need
+    # no second query. SQLite evaluates it only for the rows that survive
+    # ORDER BY ... LIMIT. The aggregate isn't guaranteed to keep the
+    # subquery's order, so captured_at comes along for _with_topics to sort on.
+    _TOPICS_COLUMN = """
+        (SELECT json_group_array(json_object(
+                    'topic', topic, 'source', source, 'captured_at', captured_at))
+         FROM (SELECT topic, source, captured_at FROM session_topics
+               WHERE session_id = s.session_id
+               ORDER BY captured_at LIMIT 10)) AS topics_json
+    """
+
+    # Fixed statement text, so sqlite3's per-connection statement cache
+    # prepares each one once however many times it runs
+    _SEARCH_SQL = """
+        SELECT s.session_id, s.project_name, s.title, s.title_display,
+               s.client, s.tags, s.exchange_count, s.start_time,
+               s.duration_minutes, s.has_compaction,
+               snippet(session_content, 1, '>>>', '<<<', '...', 40) as snippet,
+    """ + _TOPICS_COLUMN + """
+        FROM session_content
+        JOIN sessions s ON s.session_id = session_content.session_id
+        WHERE session_content MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    """
+
+    _TOPICS_SQL = """
+        SELECT topic, captured_at, exchange_number, source
+        FROM session_topics
+        WHERE session_id = ?
+        ORDER BY captured_at
+    """
+
+    _TOPIC_TIMELINE_SQL = """
+        SELECT t.topic, t.captured_at, t.exchange_number, t.source,
+               s.session_id, s.title_display, s.start_time, s.project_name
+        FROM session_topics t
+        LEFT JOIN sessions s ON s.session_id = t.session_id
+        WHERE t.session_id = ?
+        ORDER BY t.captured_at
+    """
+
+
     def search(self, query: str, limit: int = 20) -> list[dict]:
         """Full-text search across all session content."""
-        rows = self.conn.execute("""
-            SELECT s.session_id, s.project_name, s.title, s.title_display,
-                   s.client, s.tags, s.exchange_count, s.start_time,
-                   s.duration_minutes, s.has_compaction,
-                   snippet(session_content, 1, '>>>', '<<<', '...', 40) as snippet
-            FROM session_content
-            JOIN sessions s ON s.session_id = session_content.session_id
-            WHERE session_content MATCH ?
-            ORDER BY rank
-            LIMIT ?
-        """, (_escape_fts_query(query), limit)).fetchall()
+        rows = self.conn.execute(
+            self._SEARCH_SQL, (_escape_fts_query(query), limit)
+        ).fetchall()
 
-        results = []
-        for row in rows:
-            r = dict(row)
-            r['topics'] = self._get_topics(row['session_id'])
-            results.append(r)
-        return results
+        return self._with_topics(rows)
 
     def find(self, client: str = None, tag: str = None, tool: str = None,
              agent: str = None, date: str = None, week: bool = False,
@@ -105,87 +171,100 @@ class SessionSearch:
              exclude_project: str = None, has_compaction: bool = None,
              limit: int = 20) -> list[dict]:
         """Filter sessions by various criteria."""
+        # (rank, sql, params): cheap/index-usable predicates sort first so
+        # SQLite evaluates them before the '%x%' LIKE scans
         conditions = []
-        params = []
 
         if client:
-            conditions.append("s.client LIKE ?")
-            params.append(f"%{client}%")
+            conditions.append((9, "s.client LIKE ?", [f"%{client}%"]))
 
         if tag:
-            conditions.append("s.tags LIKE ?")
-            params.append(f"%{tag}%")
+            conditions.append((9, "s.tags LIKE ?", [f"%{tag}%"]))
 
+        # Correlated EXISTS: walking sessions newest-first, the LIMIT is
+        # usually filled after a few primary-key probes
         if tool:
-            conditions.append("s.session_id IN (SELECT session_id FROM session_tools WHERE tool_name LIKE ?)")
-            params.append(f"%{tool}%")
+            conditions.append((10, "EXISTS (SELECT 1 FROM session_tools st "
+                                   "WHERE st.session_id = s.session_id AND st.tool_name LIKE ?)",
+                               [f"%{tool}%"]))
 
         if agent:
-            conditions.append("s.session_id IN (SELECT session_id FROM session_agents WHERE agent_name LIKE ?)")
-            params.append(f"%{agent}%")
+            conditions.append((10, "EXISTS (SELECT 1 FROM session_agents sa "
+                                   "WHERE sa.session_id = s.session_id AND sa.agent_name LIKE ?)",
+                               [f"%{agent}%"]))
 
         if project:
-            conditions.append("(s.project_name LIKE ? OR s.project LIKE ?)")
-            params.extend([f"%{project}%", f"%{project}%"])
+            conditions.append((9, "(s.project_name LIKE ? OR s.project LIKE ?)",
+                               [f"%{project}%", f"%{project}%"]))
 
         if date:
-            conditions.append("s.start_time LIKE ?")
-            params.append(f"{date}%")
+            if date.replace('-', '').isdigit():
+                # Plain date prefix: a start_time range the index can seek
+                conditions.append((0, "s.start_time >= ? AND s.start_time < ?",
+                                   [date, date + "\uffff"]))
+            else:
+                conditions.append((9, "s.start_time LIKE ?", [f"{date}%"]))
 
         if week:
             week_ago = (datetime.now() - timedelta(days=7)).isoformat()
-            conditions.append("s.start_time >= ?")
-            params.append(week_ago)
+            conditions.append((1, "s.start_time >= ?", [week_ago]))
 
         if days:
             days_ago = (datetime.now() - timedelta(days=days)).isoformat()
-            conditions.append("s.start_time >= ?")
-            params.append(days_ago)
+            conditions.append((1, "s.start_time >= ?", [days_ago]))
 
         if exclude_project:
-            conditions.append("NOT (s.project_name LIKE ? OR s.project LIKE ?)")
-            params.extend([f"%{exclude_project}%", f"%{exclude_project}%"])
+            conditions.append((9, "NOT (s.project_name LIKE ? OR s.project LIKE ?)",
+                               [f"%{exclude_project}%", f"%{exclude_project}%"]))
 
         if has_compaction is not None:
-            conditions.append("s.has_compaction = ?")
-            params.append(1 if has_compaction else 0)
+            conditions.append((4, "s.has_compaction = ?", [1 if has_compaction else 0]))
 
-        where = " AND ".join(conditions) if conditions else "1=1"
+        conditions.sort(key=lambda c: c[0])
+        where = " AND ".join(c[1] for c in conditions) if conditions else "1=1"
+        params = [p for c in conditions for p in c[2]]
         params.append(limit)
 
         rows = self.conn.execute(f"""
             SELECT s.session_id, s.project_name, s.title, s.title_display,
                    s.client, s.tags, s.exchange_count, s.start_time,
-                   s.duration_minutes, s.has_compaction
+                   s.duration_minutes, s.has_compaction,
+                   {self._TOPICS_COLUMN}
             FROM sessions s
             WHERE {where}
             ORDER BY s.start_time DESC
             LIMIT ?
         """, params).fetchall()
 
-        results = []
-        for row in rows:
-            r = dict(row)
-            r['topics'] = self._get_topics(row['session_id'])
-            results.append(r)
-        return results
+        return self._with_topics(rows)
 
     def topics(self, session_id: str) -> list[dict]:
         """Get topic timeline for a session."""
-        rows = self.conn.execute("""
-            SELECT topic, captured_at, exchange_number, source
-            FROM session_topics
-            WHERE session_id = ?
-            ORDER BY captured_at
-        """, (session_id,)).fetchall()
+        rows = self.conn.execute(self._TOPICS_SQL, (session_id,)).fetchall()
         return [dict(r) for r in rows]
 
+    def topic_timeline(self, session_id: str) -> tuple[Optional[dict], list[dict]]:
+        """Get a session's header fields and topic timeline in one query.
+
+        The header is None if the session isn't indexed (topics can be
+        captured by the hook before the indexer has seen the session).
+        """
+        rows = self.conn.execute(self._TOPIC_TIMELINE_SQL, (session_id,)).fetchall()
+        session = None
+        if rows and rows[0]['session_id'] is not None:
+            session = {k: rows[0][k] for k in ('title_display', 'start_time', 'project_name')}
+        topics = [
+            {k: r[k] for k in ('topic', 'captured_at', 'exchange_number', 'source')}
+            for r in rows
+        ]
+        return session, topics
+
     def recent(self, n: int = 10) -> list[dict]:
         """Get N most recent sessions."""
         return self.find(limit=n)
 
-    def stats(self) -> dict:
-        """Get overall statistics."""
+    def stats(self, top_n: int = 10) -> dict:
+        """Get overall statistics, with the top `top_n` projects/clients/tools."""
         try:
             from session_index.indexer import SessionIndexer
         except ImportError:
@@ -198,14 +277,16 @@ class SessionSearch:
                     return {"error": "SessionIndexer not available"}
         indexer = SessionIndexer(self.db_path)
         indexer.conn = self.conn
-        return indexer.get_stats()
+        return indexer.get_stats(top_n=top_n)
 
     def tools_usage(self, tool_name: str = None, limit: int = 20) -> list[dict]:
         """Find sessions using a specific tool, or show top tools."""
         if tool_name:
             rows = self.conn.execute("""
                 SELECT s.session_id, s.title, s.title_display, s.start_time,
-                       st.tool_name, st.use_count
+                       st.tool_name, st.use_count,
+                       COALESCE(NULLIF(s.title_display, ''), NULLIF(s.title, ''),
+                                '(unnamed)') as display_title
                 FROM session_tools st
                 JOIN sessions s ON s.session_id = st.session_id
                 WHERE st.tool_name LIKE ?
@@ -223,16 +304,16 @@ class SessionSearch:
             """, (limit,)).fetchall()
         return [dict(r) for r in rows]
 
-    def _get_topics(self, session_id: str) -> list[dict]:
-        """Get topics for a session (compact)."""
-        rows = self.conn.execute("""
-            SELECT topic, source
-            FROM session_topics
-            WHERE session_id = ?
-            ORDER BY captured_at
-            LIMIT 10
-        """, (session_id,)).fetchall()
-        return [dict(r) for r in rows]
+    @staticmethod
+    def _with_topics(rows: list) -> list[dict]:
+        """Result rows as dicts, with topics_json unpacked into a compact topic list."""
+        results = []
+        for row in rows:
+            r = dict(row)
+            topics = sorted(json.loads(r.pop('topics_json')), key=lambda t: t['captured_at'])
+            r['topics'] = [{'topic': t['topic'], 'source': t['source']} for t in topics]
+            results.append(r)
+        return results
 
 
 def format_result(r: dict, show_topics: bool = True) -> str:
@@ -343,31 +424,34 @@ def main():
                 print(f"No results for: {args.query}")
                 return
             print(f"\n🔍 {len(results)} results for \"{args.query}\"\n")
-            for r in results:
-                print(format_result(r))
-                if args.context:
+            contexts = [None] * len(results)
+            if args.context:
+                try:
+                    from session_index.analyzer import get_contexts, format_timestamp
+                except ImportError:
                     try:
-                        from session_index.analyzer import get_context
+                        from .analyzer import get_contexts, format_timestamp
                     except ImportError:
                         try:
-                            from .analyzer import get_context
+                            from session_analyzer import get_contexts, format_timestamp
                         except ImportError:
-                            try:
-                                from session_analyzer import get_context
-                            except ImportError:
-                                print("    (context not available — analyzer module not found)")
-                                print()
-                                continue
-                    ctx = get_context(r['session_id'], query=args.query, limit=3)
+                            get_contexts = None
+                if get_contexts is not None:
+                    # One lookup for every result, JSONL files read in parallel
+                    contexts = get_contexts([r['session_id'] for r in results],
+                                            query=args.query, limit=3,
+                                            conn=searcher.conn)
+            for r, ctx in zip(results, contexts):
+                print(format_result(r))
+                if args.context:
+                    if ctx is None:
+                        print("    (context not available — analyzer module not found)")
+                        print()
+                        continue
                     if ctx.get('exchanges'):
                         for ex in ctx['exchanges']:
-                            ts = ex['timestamp'][:16] if ex['timestamp'] else ''
-                            try:
-                                dt = datetime.fromisoformat(ts)
-                                ts_display = dt.strftime("%b %d, %H:%M")
-                            except (ValueError, TypeError):
-                                ts_display = ts
-                            print(f"    ┌─ {ts_display} {'─' * max(1, 36 - len(ts_display))}")
+                            ts_display = format_timestamp(ex['timestamp'])
+                            print(f"    ┌─ {ts_display + ' ─':─<37}")
                             user_preview = ex['user'][:250].replace('\n', ' ')
                             asst_preview = ex['assistant'][:250].replace('\n', ' ')
                             print(f"    │ 🧑 {user_preview}")
@@ -393,31 +477,20 @@ def main():
 
         elif args.command == 'topics':
             # Support partial session ID
-            sid = args.session_id
-            if len(sid) < 36:
-                row = searcher.conn.execute(
-                    "SELECT session_id FROM sessions WHERE session_id LIKE ?", (f"{sid}%",)
-                ).fetchone()
-                if row:
-                    sid = row['session_id']
-                else:
-                    print(f"No session found matching: {sid}")
-                    return
-
-            topics = searcher.topics(sid)
+            sid = searcher.resolve_session_id(args.session_id)
+            if sid is None:
+                print(f"No session found matching: {args.session_id}")
+                return
+
+            # Session info + topics in one query
+            session, topics = searcher.topic_timeline(sid)
             if not topics:
                 print(f"No topics recorded for session {sid[:8]}")
                 return
 
-            # Get session info
-            session = searcher.conn.execute(
-                "SELECT title_display, start_time, project_name FROM sessions WHERE session_id=?",
-                (sid,)
-            ).fetchone()
-
             if session:
                 title = session['title_display'] or '(unnamed)'
-                print(f"\n╭─── {title} {'─' * max(1, 44 - len(title))}")
+                print(f"\n╭─── {title + ' ─':─<45}")
                 meta = []
                 if session['start_time']:
                     meta.append(session['start_time'][:16])
@@ -456,12 +529,12 @@ def main():
             if stats.get('by_project'):
                 print(f"\n  📁 By project")
                 print(f"  {'─' * 36}")
-                for name, cnt in list(stats['by_project'].items())[:10]:
+                for name, cnt in stats['by_project'].items():
                     print(f"  {name:25s}  {cnt:>5d}")
             if stats.get('top_tools'):
                 print(f"\n  🔧 Top tools")
                 print(f"  {'─' * 36}")
-                for name, cnt in list(stats['top_tools'].items())[:10]:
+                for name, cnt in stats['top_tools'].items():
                     print(f"  {name:25s}  {cnt:>5d}")
             print()
 
@@ -471,8 +544,7 @@ def main():
                 print(f"\n🔧 Sessions using '{args.tool_name}'\n")
                 for r in results:
                     sid = r['session_id'][:8]
-                    title = r.get('title_display') or r.get('title') or '(unnamed)'
-                    print(f"  ◆ {sid} · {r['tool_name']} ×{r['use_count']}  {title}")
+                    print(f"  ◆ {sid} · {r['tool_name']} ×{r['use_count']}  {r['display_title']}")
             else:
                 print(f"\n🔧 Top tools across all sessions\n")
                 for r in results:
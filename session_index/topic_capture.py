@@ -15,10 +15,13 @@ Writes to:
 2. session_topics table in sessions.db
 """
 
+import atexit
 import json
+import mmap
 import os
 import sys
 import re
+import time
 from pathlib import Path
 from datetime import datetime
 
@@ -30,6 +33,7 @@ except ImportError:
 # Config
 TOPIC_INTERVAL = 10  # Capture topic every N exchanges
 STATE_FILE = Path.home() / ".session-index" / "topic-capture-state.json"
+STATE_MAX_AGE = 30 * 86400  # Sessions whose state hasn't changed in this long are dropped
 
 # Noise patterns to skip
 SKIP_PATTERNS = [
@@ -42,7 +46,24 @@ SKIP_PATTERNS = [
     r'^Please curate the memories',
     r'^implement the following plan',
 ]
-SKIP_RE = [re.compile(p, re.IGNORECASE) for p in SKIP_PATTERNS]
+SKIP_RE = re.compile('|'.join(f'(?:{p})' for p in SKIP_PATTERNS), re.IGNORECASE)
+
+# User entry marker, compact or spaced JSON. The match runs on to the end
+# of the line, so a line with a nested marker (e.g. inside toolUseResult)
+# still counts once
+USER_TYPE_RE = re.compile(rb'"type": ?"user"[^\n]*')
+# Shortest counted line plus its newline: n user entries take at least
+# n * MIN_USER_ENTRY_BYTES - 1 bytes (the last one may lack its newline)
+MIN_USER_ENTRY_BYTES = len(b'"type":"user"\n')
+
+# Topic cleanup: markdown stripping, then sentence/clause boundaries
+SYSTEM_REMINDER_RE = re.compile(r'<system-reminder>.*?</system-reminder>', re.DOTALL)
+CODE_BLOCK_RE = re.compile(r'```[\s\S]*?```')
+INLINE_CODE_RE = re.compile(r'`[^`]+`')
+LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+FORMAT_RE = re.compile(r'[#*_~]+')
+SENTENCE_RE = re.compile(r'[.!?]\s+')
+CLAUSE_RE = re.compile(r'[,;:—–\-]\s+')
 
 # Read stdin once at module level (hooks receive JSON on stdin)
 _STDIN_DATA = {}
@@ -68,20 +89,46 @@ def get_hook_event() -> str:
     return os.environ.get('CLAUDE_HOOK_EVENT_NAME', 'unknown')
 
 
-def get_exchange_count(session_path: Path) -> int:
+def get_exchange_count(session_path: Path, session_state: dict | None = None) -> int:
     """Count user messages in session JSONL (reliable per-session count).
 
     We count directly from the file rather than using the exchange counter
     state file, which lumps all sessions under 'unknown' due to broken
     CLAUDE_SESSION_ID env var.
+
+    If session_state is given, its count_offset/count_cached entries are
+    used to only scan lines appended since the last call, and are updated
+    in place (offsets only advance over complete lines).
     """
     if not session_path or not session_path.exists():
         return 0
+    offset = cached = 0
+    if session_state is not None:
+        offset = session_state.get('count_offset', 0)
+        cached = session_state.get('count_cached', 0)
     count = 0
     try:
-        with open(session_path, 'r', encoding='utf-8', errors='ignore') as f:
+        with open(session_path, 'rb') as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if len(mm) < offset:
+                        # File shrank or was rewritten — rescan from the start
+                        offset = cached = 0
+                    end = mm.rfind(b'\n', offset) + 1
+                    if end > offset:
+                        cached += sum(1 for _ in USER_TYPE_RE.finditer(mm, offset, end))
+                        offset = end
+                    if session_state is not None:
+                        session_state['count_offset'] = offset
+                        session_state['count_cached'] = cached
+                    return cached + sum(1 for _ in USER_TYPE_RE.finditer(mm, offset))
+            except (ValueError, OSError):
+                # mmap refuses empty files (and some special filesystems)
+                pass
+            if session_state is not None:
+                session_state['count_offset'] = session_state['count_cached'] = 0
             for line in f:
-                if '"type":"user"' in line or '"type": "user"' in line:
+                if b'"type":"user"' in line or b'"type": "user"' in line:
                     count += 1
     except:
         pass
@@ -98,19 +145,42 @@ def load_state() -> dict:
 
 
 def save_state(state: dict):
+    """Write the state file, dropping sessions idle for STATE_MAX_AGE.
+
+    Hooks of concurrent sessions all rewrite this one file, so it is
+    replaced atomically: a crash or an overlapping write never leaves it
+    truncated.
+    """
+    now = time.time()
+    for sid in [sid for sid, s in state.items() if now - s.setdefault('updated_at', now) > STATE_MAX_AGE]:
+        del state[sid]
     STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    STATE_FILE.write_text(json.dumps(state))
+    tmp = STATE_FILE.with_name(f"{STATE_FILE.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, STATE_FILE)
 
 
-def find_session_file(session_id: str) -> Path | None:
-    """Find session JSONL file across project dirs."""
-    projects_dir = config.get_projects_dir()
-    for project_dir in projects_dir.iterdir():
-        if not project_dir.is_dir():
-            continue
-        candidate = project_dir / f"{session_id}.jsonl"
-        if candidate.exists():
-            return candidate
+def find_session_file(session_id: str, session_state: dict | None = None) -> Path | None:
+    """Find session JSONL file across project dirs.
+
+    If session_state is given, a path remembered there from an earlier call
+    is reused while it still exists, skipping the project dir walk; a
+    freshly found path is stored back into it.
+    """
+    if session_state is not None:
+        cached = session_state.get('session_path')
+        if cached and os.path.exists(cached):
+            return Path(cached)
+    name = f"{session_id}.jsonl"
+    with os.scandir(config.get_projects_dir()) as projects:
+        for project in projects:
+            if not project.is_dir():
+                continue
+            candidate = os.path.join(project.path, name)
+            if os.path.exists(candidate):
+                if session_state is not None:
+                    session_state['session_path'] = candidate
+                return Path(candidate)
     return None
 
 
@@ -119,19 +189,24 @@ def extract_recent_user_messages(session_path: Path, count: int = 3) -> list[str
     messages = []
     try:
         # Read from end — efficient for large files
-        with open(session_path, 'r', encoding='utf-8', errors='ignore') as f:
+        with open(session_path, 'rb') as f:
             # For speed, read last 200KB (enough for recent messages)
             f.seek(0, 2)
             file_size = f.tell()
             read_size = min(file_size, 200_000)
-            f.seek(max(0, file_size - read_size))
-
-            lines = f.readlines()
-
-        # Parse in reverse to find user messages
-        for line in reversed(lines):
+            f.seek(file_size - read_size)
+            buf = f.read(read_size)
+
+        # Scan lines in reverse, only decoding candidate user messages
+        end = len(buf)
+        while end > 0:
+            start = buf.rfind(b'\n', 0, end - 1) + 1
+            line = buf[start:end]
+            end = start
+            if b'"type":"user"' not in line and b'"type": "user"' not in line:
+                continue
             try:
-                entry = json.loads(line)
+                entry = json.loads(line.decode('utf-8', errors='ignore'))
             except json.JSONDecodeError:
                 continue
 
@@ -151,7 +226,7 @@ def extract_recent_user_messages(session_path: Path, count: int = 3) -> list[str
                 continue
 
             # Skip noise
-            if any(p.search(content) for p in SKIP_RE):
+            if SKIP_RE.search(content):
                 continue
 
             messages.append(content)
@@ -169,52 +244,49 @@ def extract_topic(messages: list[str]) -> str | None:
     """Extract a concise topic from recent user messages.
 
     Strategy: take the most recent substantive message, extract first
-    sentence/clause, truncate to 60 chars.
+    sentence/clause, truncate to 60 chars. Messages that clean down to
+    nothing useful fall back to the next most recent.
     """
-    if not messages:
-        return None
-
-    # Use most recent message
-    msg = messages[-1]
-
-    # Strip system reminder content
-    msg = re.sub(r'<system-reminder>.*?</system-reminder>', '', msg, flags=re.DOTALL)
-
-    # Strip markdown formatting
-    msg = re.sub(r'```[\s\S]*?```', '', msg)  # code blocks
-    msg = re.sub(r'`[^`]+`', '', msg)  # inline code
-    msg = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', msg)  # links
-    msg = re.sub(r'[#*_~]+', '', msg)  # formatting chars
-
-    # Clean whitespace
-    msg = ' '.join(msg.split())
-    msg = msg.strip()
-
-    if not msg or len(msg) < 10:
-        # Fall back to second most recent
-        if len(messages) >= 2:
-            return extract_topic(messages[:-1])
-        return None
-
-    # Extract first sentence/clause
-    # Split on sentence boundaries
-    sentences = re.split(r'[.!?]\s+', msg)
-    topic = sentences[0].strip()
-
-    # If first sentence is too long, take first clause
-    if len(topic) > 60:
-        clauses = re.split(r'[,;:—–\-]\s+', topic)
-        topic = clauses[0].strip()
-
-    # Final truncation
-    if len(topic) > 60:
-        topic = topic[:57] + '...'
-
-    # Capitalize first letter
-    if topic:
-        topic = topic[0].upper() + topic[1:]
+    for msg in reversed(messages):
+        # Cleanup only ever shortens, so short raw messages can't qualify
+        if len(msg) < 10:
+            continue
+
+        # Strip system reminder content
+        msg = SYSTEM_REMINDER_RE.sub('', msg)
+
+        # Strip markdown formatting
+        msg = CODE_BLOCK_RE.sub('', msg)  # code blocks
+        msg = INLINE_CODE_RE.sub('', msg)  # inline code
+        msg = LINK_RE.sub(r'\1', msg)  # links
+        msg = FORMAT_RE.sub('', msg)  # formatting chars
+
+        # Clean whitespace
+        msg = ' '.join(msg.split())
+        msg = msg.strip()
+
+        if len(msg) < 10:
+            continue
+
+        # Extract first sentence/clause
+        # Split on sentence boundaries
+        topic = SENTENCE_RE.split(msg, 1)[0].strip()
+
+        # If first sentence is too long, take first clause
+        if len(topic) > 60:
+            topic = CLAUSE_RE.split(topic, 1)[0].strip()
+
+        # Final truncation
+        if len(topic) > 60:
+            topic = topic[:57] + '...'
+
+        # Capitalize first letter
+        if topic:
+            topic = topic[0].upper() + topic[1:]
 
-    return topic
+        return topic
+
+    return None
 
 
 def write_topic_file(session_id: str, topic: str):
@@ -225,18 +297,33 @@ def write_topic_file(session_id: str, topic: str):
     topic_file.write_text(topic)
 
 
+_DB_CONN = None
+
+
+def _get_conn():
+    """Sessions DB connection for this hook process, opened on first use.
+
+    Autocommit, so each INSERT is durable without an explicit commit.
+    Closed at exit.
+    """
+    global _DB_CONN
+    if _DB_CONN is None:
+        import sqlite3
+        conn = sqlite3.connect(str(config.get_db_path()), isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        atexit.register(conn.close)
+        _DB_CONN = conn
+    return _DB_CONN
+
+
 def write_topic_db(session_id: str, topic: str, source: str, exchange_number: int = None):
     """Write topic to the sessions database."""
     try:
-        import sqlite3
-        db_path = config.get_db_path()
-        conn = sqlite3.connect(str(db_path))
-        conn.execute(
+        _get_conn().execute(
             "INSERT INTO session_topics (session_id, topic, captured_at, exchange_number, source) VALUES (?, ?, ?, ?, ?)",
             (session_id, topic, datetime.now().isoformat(), exchange_number, source)
         )
-        conn.commit()
-        conn.close()
     except Exception as e:
         # DB might not exist yet if backfill hasn't run — that's OK
         print(f"Topic DB write skipped: {e}", file=sys.stderr)
@@ -265,17 +352,38 @@ def trigger_full_index(session_id: str, session_path: Path):
 
 def handle_user_prompt_submit(session_id: str):
     """Handle UserPromptSubmit — periodic topic capture."""
+    state = load_state()
+    session_state = state.setdefault(session_id, {'last_capture_at': 0})
+    before = dict(session_state)
+    try:
+        _capture_periodic_topic(session_id, session_state)
+    finally:
+        # Hooks of every session share the state file: only rewrite it when
+        # this session's entry changed (path cached, count moved, captured)
+        if session_state != before:
+            session_state['updated_at'] = time.time()
+            save_state(state)
+
+
+def _capture_periodic_topic(session_id: str, session_state: dict):
+    """Capture a topic every TOPIC_INTERVAL exchanges, updating session_state."""
+    last_capture = session_state.get('last_capture_at', 0)
+
     # Find session file first (needed for exchange counting)
-    session_path = find_session_file(session_id)
+    session_path = find_session_file(session_id, session_state)
     if not session_path:
         return
 
-    exchange_count = get_exchange_count(session_path)
+    # Skip the count when the bytes appended since the last one can't hold
+    # enough user entries to reach the next capture
+    offset = session_state.get('count_offset', 0)
+    size = os.path.getsize(session_path)
+    if size >= offset:
+        max_count = session_state.get('count_cached', 0) + (size - offset + 1) // MIN_USER_ENTRY_BYTES
+        if max_count < last_capture + TOPIC_INTERVAL:
+            return
 
-    # Check if we should capture at this interval
-    state = load_state()
-    session_state = state.get(session_id, {'last_capture_at': 0})
-    last_capture = session_state.get('last_capture_at', 0)
+    exchange_count = get_exchange_count(session_path, session_state)
 
     # Capture at intervals: 10, 20, 30, etc.
     if exchange_count < TOPIC_INTERVAL:
@@ -293,8 +401,7 @@ def handle_user_prompt_submit(session_id: str):
     write_topic_db(session_id, topic, 'hook_periodic', exchange_count)
 
     # Update state
-    state[session_id] = {'last_capture_at': exchange_count}
-    save_state(state)
+    session_state['last_capture_at'] = exchange_count
 
 
 def handle_pre_compact(session_id: str):